@@ -47,7 +47,8 @@ try:
         get_knowledge_manager,
         run_generation_workflow
     )
-    from rag.feedback_insights import get_feedback_insights
+    from rag.feedback_insights import ensure_feedback_indexes, get_feedback_insights
+    from rag.agents import MAX_LOGO_BYTES, warmup as warmup_agents
     RAG_AVAILABLE = True
 except ImportError as e:
     print(f"RAG system not available: {e}")
@@ -160,6 +161,9 @@ async def lifespan(app: FastAPI):
         try:
             vector_store = get_enhanced_vector_store()
             print(f"Vector store initialized with {vector_store.vector_store.collection.count()} documents")
+            await asyncio.to_thread(warmup_agents)
+            # Index build waits on MongoDB, so it must not hold up startup
+            app.state.feedback_index_task = asyncio.create_task(ensure_feedback_indexes(db))
         except Exception as e:
             print(f"RAG system initialization error: {e}")
             print("RAG features will be unavailable")
@@ -170,6 +174,13 @@ async def lifespan(app: FastAPI):
 
     # Cleanup (if needed)
     print("Shutting down AgenticAds backend")
+    feedback_index_task = getattr(app.state, "feedback_index_task", None)
+    if feedback_index_task is not None:
+        feedback_index_task.cancel()
+        try:
+            await feedback_index_task
+        except asyncio.CancelledError:
+            pass
 
 # CREATE FastAPI app with lifespan
 app = FastAPI(title="AgenticAds Backend API", version="1.0.0", lifespan=lifespan)
@@ -391,6 +402,10 @@ if RAG_AVAILABLE:
         logo_file: Optional[UploadFile] = File(None)
     ):
         """Generate content with logo upload using agentic RAG system"""
+        # Reject oversized uploads before any generation work starts
+        if logo_file is not None and logo_file.size is not None and logo_file.size > MAX_LOGO_BYTES:
+            raise HTTPException(status_code=413, detail="Logo file too large. Maximum size is 5MB.")
+
         try:
             # Parse outputs from comma-separated string
             output_types = [output.strip() for output in outputs.split(",")]
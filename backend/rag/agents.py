@@ -1,6 +1,7 @@
 import asyncio
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass, field, replace
+from functools import lru_cache, wraps
 import chromadb
 from sentence_transformers import SentenceTransformer
 from .text_generation import get_text_generator
@@ -8,12 +9,109 @@ from .poster_generation import PosterGenerationAgent, PosterGenerationContext
 from .video_generation import VideoGIFGenerationAgent, VideoGenerationContext
 import tempfile
 import uuid
-import aiofiles
 from pathlib import Path
 import io
+import logging
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
 from PIL import Image
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+# Theme keywords in priority order; the first matching theme wins
+THEME_KEYWORDS = {
+    'technology': ['tech', 'digital', 'innovation', 'future', 'smart', 'ai', 'app'],
+    'lifestyle': ['life', 'home', 'family', 'comfort', 'relax', 'peace'],
+    'business': ['business', 'corporate', 'professional', 'career', 'success', 'growth'],
+    'creative': ['creative', 'design', 'art', 'music', 'color', 'inspire'],
+    'food': ['food', 'restaurant', 'delicious', 'taste', 'cook', 'recipe'],
+    'fitness': ['fitness', 'health', 'workout', 'gym', 'exercise', 'strong']
+}
+
+# Lookahead alternation so overlapping keywords are all reported in a single scan
+THEME_REGEX = re.compile("|".join(
+    f"(?=(?P<{name}>{'|'.join(map(re.escape, keywords))}))"
+    for name, keywords in THEME_KEYWORDS.items()
+))
+
+# Hashtags and expressive punctuation count towards text engagement in QA
+ENGAGEMENT_MARKS_REGEX = re.compile(r"[#!?]")
+# Design vocabulary a poster prompt is expected to mention, matched against lowercased text
+POSTER_DESIGN_TERMS_REGEX = re.compile(r"color|layout|typography|design|visual|poster")
+
+# Logo uploads are read incrementally and capped in size
+LOGO_CHUNK_SIZE = 64 * 1024
+MAX_LOGO_BYTES = 5 * 1024 * 1024
+
+# Background writer for temporary logo files; futures from it can be awaited from any event loop
+_LOGO_WRITER = ThreadPoolExecutor(max_workers=2, thread_name_prefix="logo_writer")
+
+# Retrieved context keyed by (knowledge version, enhanced query, n_results); oldest entries are evicted first.
+# The vector store bumps its knowledge version on every add or clear, so results from before a seed or
+# ingest are never served again.
+CONTEXT_CACHE_SIZE = 2048
+_context_cache: Dict[Tuple[int, str, int], Tuple[str, ...]] = {}
+
+def _cache_context(key: Tuple[int, str, int], documents: List[str]) -> None:
+    """Remember non-empty retrieval results, dropping the oldest entry when full"""
+    if not documents:
+        return
+    if len(_context_cache) >= CONTEXT_CACHE_SIZE:
+        del _context_cache[next(iter(_context_cache))]
+    _context_cache[key] = tuple(documents)
+
+# Shared empty default for absent feedback lists, avoids allocating a fresh [] per lookup
+EMPTY: tuple = ()
+_FEEDBACK_KEYS = ("feedback_highlights", "feedback_suggestions", "feedback_keywords")
+
+def _feedback_lists(state: Dict[str, Any]) -> Tuple[List[str], ...]:
+    """Return the (highlights, suggestions, keywords) feedback lists from state"""
+    return tuple(state.get(key) or EMPTY for key in _FEEDBACK_KEYS)
+
+def requires_output_type(output_type: str, notes_key: str):
+    """Skip an agent's execute() when its output type was not requested"""
+    skip_note = f"{output_type.capitalize()} generation skipped - not requested"
+
+    def decorator(execute):
+        @wraps(execute)
+        async def wrapper(self, state: Dict[str, Any]) -> Dict[str, Any]:
+            if output_type not in state.get("output_types", ()):
+                logger.debug("%s: %s", self.name, skip_note)
+                return state | {notes_key: skip_note}
+            return await execute(self, state)
+        return wrapper
+    return decorator
+
+@lru_cache(maxsize=64)
+def _prompt_skeleton(platform: str, tone: str) -> str:
+    """Static part of the poster prompt, which only depends on platform and tone"""
+    return "\n".join([
+        "",
+        "**CONTENT INTEGRATION:**",
+        "- Main headline text should be prominently displayed",
+        "- Supporting text should complement the main message",
+        "- Include relevant visual metaphors or icons that represent the ad content",
+        "- Ensure text is readable and well-positioned",
+        "",
+        "**PLATFORM OPTIMIZATION:**",
+        f"- Optimized for {platform} platform specifications",
+        f"- Use {tone} visual tone throughout",
+        "- Include appropriate visual elements for social media engagement",
+        "",
+        "**TECHNICAL SPECIFICATIONS:**",
+        "- High-quality, professional design",
+        "- Proper contrast for text readability",
+        "- Brand-appropriate styling",
+        "- Mobile-friendly layout"
+    ])
+
+def warmup() -> None:
+    """Pay one-time startup costs (Pillow plugins, regex, text generator) before the first request"""
+    Image.preinit()
+    THEME_REGEX.search("")
+    get_text_generator()
+
+@dataclass(slots=True)
 class AgentContext:
     """Shared context for all agents"""
     platform: str
@@ -29,16 +127,31 @@ class AgentContext:
     feedback_avg_rating: Optional[float] = None
     logo_data: Optional[bytes] = None
     logo_position: str = "top-right"
+    # Lowercased copies for the QA substring checks, derived once per context
+    platform_lc: str = field(init=False, repr=False)
+    brand_lc: str = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.platform_lc = self.platform.lower()
+        self.brand_lc = (self.brand_guidelines or "").lower()
 
 class BaseAgent:
     """Base class for all agents"""
 
+    _text_generator = None
+
     def __init__(self, name: str, context: AgentContext):
         self.name = name
         self.context = context
         self.vector_store = context.vector_store
         self.embedding_model = context.embedding_model
-        self.text_generator = get_text_generator()
+
+    @property
+    def text_generator(self):
+        """Shared text generation service, resolved once on first use"""
+        if BaseAgent._text_generator is None:
+            BaseAgent._text_generator = get_text_generator()
+        return BaseAgent._text_generator
 
     async def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Execute agent logic - to be implemented by subclasses"""
@@ -48,30 +161,82 @@ class BaseAgent:
         """Retrieve relevant context from vector store"""
         try:
             if not self.vector_store or not hasattr(self.vector_store, "collection"):
-                print("Vector store not properly initialized")
+                logger.warning("Vector store not properly initialized")
                 return []
 
             enhanced_query = f"{query} {self.context.platform} {self.context.tone}"
+            cache_key = (self.vector_store.knowledge_version, enhanced_query, n_results)
+            cached = _context_cache.get(cache_key)
+            if cached is not None:
+                logger.debug("RAG cache hit: %r", enhanced_query)
+                return list(cached)
+
+            # Same embedding model as the batch path and the stored documents, so a cache key means one search
+            query_embeddings = self.embedding_model.encode([enhanced_query], normalize_embeddings=True)
             results = self.vector_store.collection.query(
-                query_texts=[enhanced_query],
-                n_results=n_results
+                query_embeddings=query_embeddings,
+                n_results=n_results,
+                include=["documents"]
             )
             
-            print(f"🔍 RAG Query: '{enhaled_query}'")
-            print(f"📊 Results found: {len(results['documents'][0]) if results['documents'] else 0}")
+            logger.debug("RAG query: %r", enhanced_query)
+            # Single query, so unpack its one result list once
+            (documents,) = results["documents"] or ([],)
+            logger.debug("RAG results found: %d", len(documents))
             
-            if results and results['documents'] and len(results['documents'][0]) > 0:
-                context = results["documents"][0][:3]
-                print(f"📚 Retrieved context: {len(context)} items")
+            if documents:
+                context = documents[:3]
+                logger.debug("Retrieved context: %d items", len(context))
+                _cache_context(cache_key, context)
                 return context
             else:
-                print("⚠️  No context retrieved from knowledge base")
+                logger.debug("No context retrieved from knowledge base")
                 return []
                 
         except Exception as e:
-            print(f"Error retrieving context: {str(e)}")
+            logger.error("Error retrieving context: %s", e)
             return []
 
+    def _retrieve_context_batch(self, queries: List[str], n_results: int = 5) -> List[List[str]]:
+        """Retrieve context for several queries with one embedding pass and one vector store call"""
+        try:
+            if not self.vector_store or not hasattr(self.vector_store, "collection"):
+                logger.warning("Vector store not properly initialized")
+                return [[] for _ in queries]
+
+            suffix = f" {self.context.platform} {self.context.tone}"
+            enhanced_queries = [query + suffix for query in queries]
+            version = self.vector_store.knowledge_version
+            cached = [_context_cache.get((version, query, n_results)) for query in enhanced_queries]
+            misses = [query for query, hit in zip(enhanced_queries, cached) if hit is None]
+            if not misses:
+                logger.debug("RAG cache hit for all %d queries", len(queries))
+                return [list(hit) for hit in cached]
+
+            query_embeddings = self.embedding_model.encode(misses, batch_size=len(misses),
+                                                           normalize_embeddings=True)
+            results = self.vector_store.collection.query(
+                query_embeddings=query_embeddings,
+                n_results=n_results,
+                include=["documents"]
+            )
+
+            batches = iter(results["documents"] or [[] for _ in misses])
+            logger.debug("RAG batch of %d queries, %d served from cache", len(queries), len(queries) - len(misses))
+            context = []
+            for query, hit in zip(enhanced_queries, cached):
+                if hit is None:
+                    documents = next(batches)[:3]
+                    _cache_context((version, query, n_results), documents)
+                    context.append(documents)
+                else:
+                    context.append(list(hit))
+            return context
+
+        except Exception as e:
+            logger.error("Error retrieving batched context: %s", e)
+            return [[] for _ in queries]
+
 class LogoIntegrationAgent(BaseAgent):
     """Handles logo upload, temporary storage, and integration into final posters"""
 
@@ -82,11 +247,11 @@ class LogoIntegrationAgent(BaseAgent):
 
     async def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Process logo upload and prepare for poster integration"""
-        print("🎨 LogoIntegrationAgent: Starting logo processing...")
+        logger.debug("LogoIntegrationAgent: Starting logo processing")
 
         logo_file = state.get("logo_file")
         if not logo_file:
-            print("ℹ️ LogoIntegrationAgent: No logo file provided")
+            logger.debug("LogoIntegrationAgent: No logo file provided")
             return {
                 **state,
                 "logo_processed": False,
@@ -94,13 +259,27 @@ class LogoIntegrationAgent(BaseAgent):
             }
 
         try:
-            print(f"🎨 LogoIntegrationAgent: Processing logo file: {logo_file.filename}")
+            logger.debug("LogoIntegrationAgent: Processing logo file: %s", logo_file.filename)
+
+            # Read in chunks so oversized uploads are rejected without buffering all of them
+            logo_buffer = bytearray()
+            while chunk := await logo_file.read(LOGO_CHUNK_SIZE):
+                logo_buffer += chunk
+                if len(logo_buffer) > MAX_LOGO_BYTES:
+                    logger.warning("LogoIntegrationAgent: Logo file too large (>5MB)")
+                    return {
+                        **state,
+                        "logo_processed": False,
+                        "logo_error": "Logo file too large. Maximum size is 5MB.",
+                        "logo_integration_notes": "Logo validation failed"
+                    }
 
-            logo_data = await logo_file.read()
-            print(f"🎨 LogoIntegrationAgent: Logo file read, size: {len(logo_data)} bytes")
+            logo_data = bytes(logo_buffer)
+            logger.debug("LogoIntegrationAgent: Logo file read, size: %d bytes", len(logo_data))
 
+            # Validate the whole file; JPEG metadata segments can push the size header past the first chunk
             if not self._validate_logo_file(logo_data):
-                print("❌ LogoIntegrationAgent: Invalid logo file format")
+                logger.warning("LogoIntegrationAgent: Invalid logo file format")
                 return {
                     **state,
                     "logo_processed": False,
@@ -109,14 +288,17 @@ class LogoIntegrationAgent(BaseAgent):
                 }
 
             logo_id = f"logo_{uuid.uuid4().hex[:12]}"
-            logo_path = await self._save_logo_temporarily(logo_data, logo_id, logo_file.filename)
-            print(f"🎨 LogoIntegrationAgent: Logo saved to: {logo_path}")
+            logo_path, logo_save_task = self._save_logo_temporarily(logo_data, logo_id, logo_file.filename)
+            logger.debug("LogoIntegrationAgent: Logo save scheduled to: %s", logo_path)
 
-            updated_context = self.context
-            updated_context.logo_data = logo_data
-            updated_context.logo_position = state.get("logo_position", "top-right")
+            # Copy rather than mutate: the context object may be shared with other agents
+            self.context = replace(
+                self.context,
+                logo_data=logo_data,
+                logo_position=state.get("logo_position", "top-right")
+            )
 
-            print(f"🎨 LogoIntegrationAgent: Logo prepared for integration at {updated_context.logo_position}")
+            logger.debug("LogoIntegrationAgent: Logo prepared for integration at %s", self.context.logo_position)
 
             return {
                 **state,
@@ -126,12 +308,13 @@ class LogoIntegrationAgent(BaseAgent):
                 "logo_path": str(logo_path),
                 "logo_filename": logo_file.filename,
                 "logo_size": len(logo_data),
+                "logo_save_task": logo_save_task,
                 "logo_integration_notes": f"Logo '{logo_file.filename}' ready for poster integration"
             }
 
         except Exception as e:
             error_msg = f"Error processing logo: {str(e)}"
-            print(f"❌ LogoIntegrationAgent: {error_msg}")
+            logger.error("LogoIntegrationAgent: %s", error_msg)
             return {
                 **state,
                 "logo_processed": False,
@@ -140,51 +323,45 @@ class LogoIntegrationAgent(BaseAgent):
             }
 
     def _validate_logo_file(self, logo_data: bytes) -> bool:
-        """Validate that the uploaded file is a valid image"""
+        """Validate format and dimensions of the uploaded image"""
         try:
+            # Image.open only parses the header; pixel data is not decoded
             image = Image.open(io.BytesIO(logo_data))
 
-            if len(logo_data) > 5 * 1024 * 1024:
-                print("❌ LogoIntegrationAgent: Logo file too large (>5MB)")
-                return False
-
             width, height = image.size
             if width > 2000 or height > 2000:
-                print("❌ LogoIntegrationAgent: Logo dimensions too large (>2000px)")
+                logger.warning("LogoIntegrationAgent: Logo dimensions too large (>2000px)")
                 return False
 
             valid_formats = ['PNG', 'JPEG', 'JPG', 'SVG', 'WEBP']
             if image.format and image.format.upper() not in valid_formats:
-                print(f"❌ LogoIntegrationAgent: Unsupported format: {image.format}")
+                logger.warning("LogoIntegrationAgent: Unsupported format: %s", image.format)
                 return False
 
-            print(f"✅ LogoIntegrationAgent: Valid logo - {image.format} {width}x{height}")
+            logger.debug("LogoIntegrationAgent: Valid logo - %s %dx%d", image.format, width, height)
             return True
 
         except Exception as e:
-            print(f"❌ LogoIntegrationAgent: Logo validation failed: {str(e)}")
+            logger.warning("LogoIntegrationAgent: Logo validation failed: %s", e)
             return False
 
-    async def _save_logo_temporarily(self, logo_data: bytes, logo_id: str, original_filename: str) -> Path:
-        """Save logo file temporarily with unique ID"""
+    def _save_logo_temporarily(self, logo_data: bytes, logo_id: str, original_filename: str) -> Tuple[Path, Future]:
+        """Schedule the temporary logo write in the background and return its path and future"""
         file_extension = Path(original_filename).suffix.lower() or ".png"
         temp_filename = f"{logo_id}{file_extension}"
         temp_path = self.temp_logo_dir / temp_filename
 
-        async with aiofiles.open(temp_path, 'wb') as f:
-            await f.write(logo_data)
-
-        print(f"💾 LogoIntegrationAgent: Logo saved to temporary file: {temp_path}")
-        return temp_path
+        save_task = _LOGO_WRITER.submit(temp_path.write_bytes, logo_data)
+        return temp_path, save_task
 
     def cleanup_temp_logo(self, logo_id: str):
         """Clean up temporary logo file"""
         try:
             for logo_file in self.temp_logo_dir.glob(f"{logo_id}.*"):
                 logo_file.unlink()
-                print(f"🧹 LogoIntegrationAgent: Cleaned up temp logo: {logo_file}")
+                logger.debug("LogoIntegrationAgent: Cleaned up temp logo: %s", logo_file)
         except Exception as e:
-            print(f"⚠️ LogoIntegrationAgent: Failed to cleanup logo {logo_id}: {str(e)}")
+            logger.warning("LogoIntegrationAgent: Failed to cleanup logo %s: %s", logo_id, e)
 
 
 class PosterFinalizationAgent(BaseAgent):
@@ -196,12 +373,12 @@ class PosterFinalizationAgent(BaseAgent):
 
     async def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Finalize poster with proper logo integration"""
-        print("🎨 PosterFinalizationAgent: Starting poster finalization...")
+        logger.debug("PosterFinalizationAgent: Starting poster finalization")
 
         logo_processed = state.get("logo_processed", False)
 
         if not logo_processed:
-            print("ℹ️ PosterFinalizationAgent: No logo to integrate")
+            logger.debug("PosterFinalizationAgent: No logo to integrate")
             return {
                 **state,
                 "poster_finalized": True,
@@ -214,20 +391,25 @@ class PosterFinalizationAgent(BaseAgent):
             poster_url = state.get("poster_url")
 
             if not logo_id or not poster_url:
-                print("⚠️ PosterFinalizationAgent: Missing logo or poster data")
+                logger.warning("PosterFinalizationAgent: Missing logo or poster data")
                 return {
                     **state,
                     "poster_finalized": False,
                     "finalization_notes": "Missing logo or poster data for finalization"
                 }
 
-            print(f"🎨 PosterFinalizationAgent: Finalizing poster with logo {logo_id}")
+            logger.debug("PosterFinalizationAgent: Finalizing poster with logo %s", logo_id)
+
+            # Make sure the background logo write has landed before cleaning it up
+            logo_save_task = state.get("logo_save_task")
+            if logo_save_task is not None and not logo_save_task.done():
+                await asyncio.wrap_future(logo_save_task)
 
             # Clean up temporary logo file after successful integration
             if hasattr(self, 'logo_agent') and self.logo_agent:
                 self.logo_agent.cleanup_temp_logo(logo_id)
 
-            print("✅ PosterFinalizationAgent: Poster finalization completed successfully")
+            logger.info("PosterFinalizationAgent: Poster finalization completed")
 
             return {
                 **state,
@@ -237,7 +419,7 @@ class PosterFinalizationAgent(BaseAgent):
 
         except Exception as e:
             error_msg = f"Error finalizing poster: {str(e)}"
-            print(f"❌ PosterFinalizationAgent: {error_msg}")
+            logger.error("PosterFinalizationAgent: %s", error_msg)
             return {
                 **state,
                 "poster_finalized": False,
@@ -245,81 +427,6 @@ class PosterFinalizationAgent(BaseAgent):
             }
 
 
-# Rest of the imports and class definitions
-import asyncio
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
-import chromadb
-from sentence_transformers import SentenceTransformer
-from .text_generation import get_text_generator
-from .poster_generation import PosterGenerationAgent, PosterGenerationContext
-from .video_generation import VideoGIFGenerationAgent, VideoGenerationContext
-import tempfile
-import uuid
-import aiofiles
-from pathlib import Path
-import io
-from PIL import Image
-
-@dataclass
-class AgentContext:
-    """Shared context for all agents"""
-    platform: str
-    tone: str
-    brand_guidelines: Optional[str]
-    input_text: str
-    vector_store: Any
-    embedding_model: Any
-    feedback_summary: Optional[str] = None
-    feedback_highlights: Optional[List[str]] = None
-    feedback_suggestions: Optional[List[str]] = None
-    feedback_keywords: Optional[List[str]] = None
-    feedback_avg_rating: Optional[float] = None
-    logo_data: Optional[bytes] = None
-    logo_position: str = "top-right"
-
-class BaseAgent:
-    """Base class for all agents"""
-
-    def __init__(self, name: str, context: AgentContext):
-        self.name = name
-        self.context = context
-        self.vector_store = context.vector_store
-        self.embedding_model = context.embedding_model
-        self.text_generator = get_text_generator()
-
-    async def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute agent logic - to be implemented by subclasses"""
-        raise NotImplementedError
-
-    def _retrieve_context(self, query: str, n_results: int = 5) -> List[str]:
-        """Retrieve relevant context from vector store"""
-        try:
-            if not self.vector_store or not hasattr(self.vector_store, "collection"):
-                print("Vector store not properly initialized")
-                return []
-
-            enhanced_query = f"{query} {self.context.platform} {self.context.tone}"
-            results = self.vector_store.collection.query(
-                query_texts=[enhanced_query],
-                n_results=n_results
-            )
-            
-            print(f"🔍 RAG Query: '{enhanced_query}'")
-            print(f"📊 Results found: {len(results['documents'][0]) if results['documents'] else 0}")
-            
-            if results['documents'] and results['documents'][0]:
-                context = results["documents"][0][:3]
-                print(f"📚 Retrieved context: {len(context)} items")
-                return context
-            else:
-                print("⚠️  No context retrieved from knowledge base")
-                return []
-
-        except Exception as e:
-            print(f"❌ Error retrieving context: {e}")
-            return []
-
 class ContentResearcher(BaseAgent):
     """Retrieves relevant templates and successful examples"""
 
@@ -337,12 +444,12 @@ class ContentResearcher(BaseAgent):
             f"{self.context.tone} marketing copy examples"
         ]
 
-        research_results = []
-        for query in queries:
-            context_docs = self._retrieve_context(query, 3)
-            research_results.extend(context_docs)
+        # One embedding pass and one vector store call for all research queries
+        results = await asyncio.to_thread(self._retrieve_context_batch, queries, 3)
 
-        unique_context = list(set(research_results))[:10]
+        # Ordered dedup: keeps the most relevant examples first
+        seen = dict.fromkeys(doc for docs in results for doc in docs)
+        unique_context = list(seen)[:10]
 
         return {
             **state,
@@ -356,29 +463,20 @@ class CopywriterAgent(BaseAgent):
     def __init__(self, context: AgentContext):
         super().__init__("CopywriterAgent", context)
 
+    @requires_output_type("text", "copywriter_notes")
     async def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Generate platform-optimized text"""
-        output_types = state.get("output_types", [])
-        
-        if "text" not in output_types:
-            return {
-                **state,
-                "generated_text": state.get("generated_text", ""),
-                "copywriter_notes": "Text generation skipped - not requested"
-            }
-
         research_context = state.get("research_context", [])
         input_text = state.get("input", self.context.input_text)
 
-        print(f"CopywriterAgent: Starting text generation for input: '{input_text[:50]}...'")
+        logger.debug("CopywriterAgent: Starting text generation for input: %.50r", input_text)
 
         context_str = "\n".join(research_context[:5]) if research_context else "No specific examples found."
-        print(f"CopywriterAgent: Using context: '{context_str[:50]}...'")
+        logger.debug("CopywriterAgent: Using context: %.50r", context_str)
 
         try:
-            print("CopywriterAgent: Calling _generate_text...")
-            generated_text = self._generate_text_sync(state)
-            print(f"CopywriterAgent: Generated text: '{generated_text[:50]}...'")
+            generated_text = await asyncio.to_thread(self._generate_text_sync, state)
+            logger.debug("CopywriterAgent: Generated text: %.50r", generated_text)
 
             return {
                 **state,
@@ -387,7 +485,7 @@ class CopywriterAgent(BaseAgent):
             }
         except Exception as e:
             error_msg = f"Error generating text: {str(e)}"
-            print(f"CopywriterAgent: {error_msg}")
+            logger.error("CopywriterAgent: %s", error_msg)
             return {
                 **state,
                 "generated_text": error_msg,
@@ -397,19 +495,20 @@ class CopywriterAgent(BaseAgent):
 
     def _generate_text_sync(self, state: Dict[str, Any]) -> str:
         """Generate text synchronously using the Gemini model with feedback awareness"""
+        feedback_highlights, feedback_suggestions, feedback_keywords = _feedback_lists(state)
+
         try:
-            print(f"_generate_text_sync: Starting generation")
             
             examples = self._retrieve_context(
                 f"{self.context.platform} {self.context.tone} ad examples",
                 n_results=3
             )
             
-            print(f"_generate_text_sync: Retrieved {len(examples)} examples")
+            logger.debug("_generate_text_sync: Retrieved %d examples", len(examples))
             
             if not examples:
                 examples = self._retrieve_context("successful ad examples", n_results=2)
-                print(f"_generate_text_sync: Fallback retrieved {len(examples)} examples")
+                logger.debug("_generate_text_sync: Fallback retrieved %d examples", len(examples))
             
             context_examples: List[Dict[str, Any]] = []
             for example in examples:
@@ -428,10 +527,10 @@ class CopywriterAgent(BaseAgent):
                             }
                         })
                 except Exception as e:
-                    print(f"_generate_text_sync: Error processing example: {e}")
+                    logger.warning("_generate_text_sync: Error processing example: %s", e)
                     continue
             
-            print(f"_generate_text_sync: Processed {len(context_examples)} context examples")
+            logger.debug("_generate_text_sync: Processed %d context examples", len(context_examples))
             
             if not context_examples:
                 context_examples = [{
@@ -442,11 +541,7 @@ class CopywriterAgent(BaseAgent):
                         "is_fallback": True
                     }
                 }]
-                print("_generate_text_sync: Using fallback example")
-
-            feedback_highlights: List[str] = state.get("feedback_highlights", [])
-            feedback_suggestions: List[str] = state.get("feedback_suggestions", [])
-            feedback_keywords: List[str] = state.get("feedback_keywords", [])
+                logger.debug("_generate_text_sync: Using fallback example")
 
             if self.context.feedback_summary:
                 context_examples.insert(0, {
@@ -472,7 +567,7 @@ class CopywriterAgent(BaseAgent):
                     "metadata": {"source": "user_feedback"}
                 })
 
-            print(f"_generate_text_sync: Calling text_generator.generate_ad with {len(context_examples)} examples")
+            logger.debug("_generate_text_sync: Calling generate_ad with %d examples", len(context_examples))
             
             generated_text = self.text_generator.generate_ad(
                 context=context_examples,
@@ -481,7 +576,7 @@ class CopywriterAgent(BaseAgent):
                 input_text=self.context.input_text
             )
             
-            print(f"_generate_text_sync: Text generation completed, result length: {len(generated_text)}")
+            logger.debug("_generate_text_sync: Text generation completed, result length: %d", len(generated_text))
             
             if not generated_text or len(generated_text.strip()) < 10:
                 raise ValueError("Generated text too short or empty")
@@ -489,7 +584,7 @@ class CopywriterAgent(BaseAgent):
             return generated_text
             
         except Exception as e:
-            print(f"Error in text generation: {str(e)}")
+            logger.error("Error in text generation: %s", e)
             fallback_focus = feedback_suggestions[0][:100] if feedback_suggestions else "premium experience"
             fallback_text = (
                 f"🚀 {self.context.input_text[:100]}\n\n"
@@ -505,29 +600,16 @@ class VisualDesignerAgent(BaseAgent):
         super().__init__("VisualDesignerAgent", context)
         self.poster_agent = None
 
+    @requires_output_type("poster", "visual_designer_notes")
     async def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Generate poster design prompts and actual poster images"""
-        output_types = state.get("output_types", [])
-
-        print(f"VisualDesignerAgent: Starting execution with output_types: {output_types}")
-
-        if "poster" not in output_types:
-            print("VisualDesignerAgent: Poster generation skipped - not requested")
-            return {
-                **state,
-                "poster_prompt": state.get("poster_prompt", ""),
-                "poster_url": state.get("poster_url", ""),
-                "visual_designer_notes": "Poster generation skipped - not requested"
-            }
-
-        print("VisualDesignerAgent: Poster generation requested - starting process")
         generated_text = state.get("generated_text", "")
         logo_data = state.get("logo_data")
         logo_position = state.get("logo_position", "top-right")
+        feedback_highlights, feedback_suggestions, _ = _feedback_lists(state)
 
-        print(f"🎨 VisualDesignerAgent: Logo data available: {bool(logo_data)}")
-        print(f"🎨 VisualDesignerAgent: Logo data size: {len(logo_data) if logo_data else 0} bytes")
-        print(f"🎨 VisualDesignerAgent: Logo position: {logo_position}")
+        logger.debug("VisualDesignerAgent: Logo data size: %d bytes, position: %s",
+                     len(logo_data) if logo_data else 0, logo_position)
 
         visual_queries = [
             f"{self.context.platform} visual design trends",
@@ -535,10 +617,12 @@ class VisualDesignerAgent(BaseAgent):
             "successful ad poster designs"
         ]
 
+        # Generic inspiration is only useful when there is no feedback to steer the design
         visual_context = []
-        for query in visual_queries:
-            context_docs = self._retrieve_context(query, 2)
-            visual_context.extend(context_docs)
+        if not (self.context.feedback_keywords or self.context.feedback_suggestions):
+            results = await asyncio.to_thread(self._retrieve_context_batch, visual_queries, 1)
+            for context_docs in results:
+                visual_context.extend(context_docs)
 
         visual_inspiration = "\n".join(visual_context[:3]) if visual_context else ""
         if self.context.feedback_keywords:
@@ -550,11 +634,11 @@ class VisualDesignerAgent(BaseAgent):
             design_prompt = self._generate_poster_prompt_sync(
                 generated_text,
                 visual_inspiration,
-                state.get("feedback_highlights", []),
-                state.get("feedback_suggestions", [])
+                feedback_highlights,
+                feedback_suggestions
             )
 
-            print(f"VisualDesignerAgent: Generated poster prompt: {design_prompt[:100]}...")
+            logger.debug("VisualDesignerAgent: Generated poster prompt: %.100s", design_prompt)
 
             poster_context = PosterGenerationContext(
                 platform=self.context.platform,
@@ -572,8 +656,7 @@ class VisualDesignerAgent(BaseAgent):
                 **state
             })
 
-            print(f"VisualDesignerAgent: Poster generation result: poster_url={poster_state.get('poster_url', 'None')[:50]}...")
-            print(f"VisualDesignerAgent: Poster generation completed. URL: {poster_state.get('poster_url', 'None')[:50]}...")
+            logger.info("VisualDesignerAgent: Poster generation completed. URL: %.50s", poster_state.get("poster_url"))
 
             return {
                 **state,
@@ -583,9 +666,7 @@ class VisualDesignerAgent(BaseAgent):
 
         except Exception as e:
             error_msg = f"Error in poster generation: {str(e)}"
-            print(f"VisualDesignerAgent: {error_msg}")
-            import traceback
-            print(f"VisualDesignerAgent: Traceback: {traceback.format_exc()}")
+            logger.exception("VisualDesignerAgent: %s", error_msg)
             return {
                 **state,
                 "poster_prompt": f"Create a {self.context.tone} {self.context.platform} poster featuring: {generated_text[:100]}",
@@ -612,23 +693,7 @@ class VisualDesignerAgent(BaseAgent):
             f"- Primary visual theme: {visual_elements.get('theme', 'Modern and professional')}",
             f"- Color scheme: {visual_elements.get('colors', 'Professional blue and white palette')}",
             f"- Layout style: {visual_elements.get('layout', 'Clean, modern layout with clear visual hierarchy')}",
-            "",
-            "**CONTENT INTEGRATION:**",
-            "- Main headline text should be prominently displayed",
-            "- Supporting text should complement the main message",
-            "- Include relevant visual metaphors or icons that represent the ad content",
-            "- Ensure text is readable and well-positioned",
-            "",
-            "**PLATFORM OPTIMIZATION:**",
-            f"- Optimized for {self.context.platform} platform specifications",
-            f"- Use {self.context.tone} visual tone throughout",
-            "- Include appropriate visual elements for social media engagement",
-            "",
-            "**TECHNICAL SPECIFICATIONS:**",
-            "- High-quality, professional design",
-            "- Proper contrast for text readability",
-            "- Brand-appropriate styling",
-            "- Mobile-friendly layout"
+            _prompt_skeleton(self.context.platform, self.context.tone)
         ]
 
         if inspiration and len(inspiration.strip()) > 0:
@@ -654,31 +719,27 @@ class VisualDesignerAgent(BaseAgent):
         """Extract visual design elements from ad text content"""
         text_lower = text.lower()
 
-        theme_keywords = {
-            'technology': ['tech', 'digital', 'innovation', 'future', 'smart', 'ai', 'app'],
-            'lifestyle': ['life', 'home', 'family', 'comfort', 'relax', 'peace'],
-            'business': ['business', 'corporate', 'professional', 'career', 'success', 'growth'],
-            'creative': ['creative', 'design', 'art', 'music', 'color', 'inspire'],
-            'food': ['food', 'restaurant', 'delicious', 'taste', 'cook', 'recipe'],
-            'fitness': ['fitness', 'health', 'workout', 'gym', 'exercise', 'strong']
-        }
+        # One regex pass collects every theme/keyword hit in the text
+        matches = [(m.lastgroup, m.group(m.lastgroup)) for m in THEME_REGEX.finditer(text_lower)]
+        matched_themes = {name for name, _ in matches}
+        matched_words = {word for _, word in matches}
 
         theme = "Modern and professional"
-        for theme_name, keywords in theme_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
+        for theme_name in THEME_KEYWORDS:
+            if theme_name in matched_themes:
                 theme = f"Professional {theme_name} theme"
                 break
 
         colors = "Professional blue and white palette"
-        if 'creative' in theme or 'art' in text_lower:
+        if 'creative' in theme or 'art' in matched_words:
             colors = "Vibrant and creative color palette"
         elif 'business' in theme:
             colors = "Corporate blue and gray palette"
-        elif 'food' in text_lower:
+        elif 'food' in matched_words:
             colors = "Warm, appetizing colors"
 
         layout = "Clean, modern layout with clear visual hierarchy"
-        if 'tech' in theme or 'innovation' in text_lower:
+        if 'tech' in theme or 'innovation' in matched_words:
             layout = "Modern, tech-focused layout with clean lines"
 
         return {
@@ -693,30 +754,28 @@ class VideoScriptwriterAgent(BaseAgent):
     def __init__(self, context: AgentContext):
         super().__init__("VideoScriptwriterAgent", context)
         self.video_agent = None
+        # Platform and tone are fixed per agent, so only text, CTA and cues are filled in per script
+        tone = context.tone.replace("{", "{{").replace("}", "}}")
+        self._script_template = (
+            "SCENE 1: Opening shot - Dynamic visual introduction\n"
+            "NARRATION: {text}\n\n"
+            f"SCENE 2: Product/Service showcase with {tone} tone\n"
+            "NARRATION: Experience innovation like never before\n\n"
+            "SCENE 3: Call-to-action with platform-specific elements\n"
+            "NARRATION: {cta}!\n\n"
+            "Creative cues:\n{inspiration}"
+        )
+        self._default_cta = f"Join us on {context.platform} today"
 
+    @requires_output_type("video", "video_scriptwriter_notes")
     async def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Generate video script and actual video GIF"""
-        output_types = state.get("output_types", [])
-        
-        print(f"VideoScriptwriterAgent: Starting execution with output_types: {output_types}")
-        
-        # Skip video generation if not requested
-        if "video" not in output_types:
-            print("VideoScriptwriterAgent: Video generation skipped - not requested")
-            return {
-                **state,
-                "video_script": state.get("video_script", ""),
-                "video_scriptwriter_notes": "Video generation skipped - not requested"
-            }
-
-        print("VideoScriptwriterAgent: Video generation requested - starting process")
         generated_text = state.get("generated_text", "")
         logo_data = state.get("logo_data")
         logo_position = state.get("logo_position", "top-right")
 
-        print(f"🎬 VideoScriptwriterAgent: Logo data available: {bool(logo_data)}")
-        print(f"🎬 VideoScriptwriterAgent: Logo data size: {len(logo_data) if logo_data else 0} bytes")
-        print(f"🎬 VideoScriptwriterAgent: Logo position: {logo_position}")
+        logger.debug("VideoScriptwriterAgent: Logo data size: %d bytes, position: %s",
+                     len(logo_data) if logo_data else 0, logo_position)
 
         # Research video storytelling patterns
         video_queries = [
@@ -725,10 +784,8 @@ class VideoScriptwriterAgent(BaseAgent):
             "successful video ad scripts"
         ]
 
-        video_context = []
-        for query in video_queries:
-            context_docs = self._retrieve_context(query, 2)
-            video_context.extend(context_docs)
+        results = await asyncio.to_thread(self._retrieve_context_batch, video_queries, 2)
+        video_context = [doc for docs in results for doc in docs]
 
         video_inspiration = "\n".join(video_context[:3]) if video_context else ""
         if self.context.feedback_summary:
@@ -739,10 +796,10 @@ class VideoScriptwriterAgent(BaseAgent):
             video_script = self._generate_video_script_sync(
                 generated_text,
                 video_inspiration,
-                state.get("feedback_suggestions", [])
+                state.get("feedback_suggestions") or EMPTY
             )
 
-            print(f"VideoScriptwriterAgent: Generated video script: {video_script[:100]}...")
+            logger.debug("VideoScriptwriterAgent: Generated video script: %.100s", video_script)
 
             # Initialize video generation context
             video_context = VideoGenerationContext(
@@ -766,7 +823,7 @@ class VideoScriptwriterAgent(BaseAgent):
                 **state
             })
 
-            print(f"VideoScriptwriterAgent: Video generation result: video_gif_url={video_state.get('video_gif_url', 'None')[:50]}...")
+            logger.info("VideoScriptwriterAgent: Video generation completed. URL: %.50s", video_state.get("video_gif_url"))
 
             return {
                 **state,
@@ -777,31 +834,21 @@ class VideoScriptwriterAgent(BaseAgent):
 
         except Exception as e:
             error_msg = f"Error in video generation: {str(e)}"
-            print(f"VideoScriptwriterAgent: {error_msg}")
-            import traceback
-            print(f"VideoScriptwriterAgent: Traceback: {traceback.format_exc()}")
+            logger.exception("VideoScriptwriterAgent: %s", error_msg)
             
             # Return fallback script
             fallback_script = f"SCENE 1: Product showcase\nNARRATION: {generated_text[:100]}\n\nSCENE 2: Call to action\nNARRATION: Learn more today!"
             return {
                 **state,
-                "video_script": f"SCENE 1: Product showcase\nNARRATION: {generated_text[:100]}\n\nSCENE 2: Call to action\nNARRATION: Learn more today!",
+                "video_script": fallback_script,
                 "video_gif_url": None,
                 "video_scriptwriter_notes": f"Video generation failed: {error_msg}"
             }
 
     def _generate_video_script_sync(self, text: str, inspiration: str, suggestions: List[str]) -> str:
         """Generate video script synchronously"""
-        cta_line = suggestions[0][:100] if suggestions else f"Join us on {self.context.platform} today"
-        return (
-            f"SCENE 1: Opening shot - Dynamic visual introduction\n"
-            f"NARRATION: {text[:100]}\n\n"
-            f"SCENE 2: Product/Service showcase with {self.context.tone} tone\n"
-            f"NARRATION: Experience innovation like never before\n\n"
-            f"SCENE 3: Call-to-action with platform-specific elements\n"
-            f"NARRATION: {cta_line}!\n\n"
-            f"Creative cues:\n{inspiration.strip()}"
-        )
+        cta_line = suggestions[0][:100] if suggestions else self._default_cta
+        return self._script_template.format(text=text[:100], cta=cta_line, inspiration=inspiration.strip())
 
 # ... (Keep LogoIntegrationAgent and PosterFinalizationAgent classes unchanged)
 
@@ -819,23 +866,16 @@ class QualityAssuranceAgent(BaseAgent):
         video_script = state.get("video_script", "")
         video_gif_url = state.get("video_gif_url")
 
-        # Quality checks - only score requested outputs
-        quality_scores = {}
-
-        # Check text quality if requested
+        # Quality checks - only score requested outputs, running the independent scorers concurrently
+        checks = {}
         if "text" in output_types:
-            text_score = self._check_text_quality(generated_text)
-            quality_scores["text"] = text_score
-
-        # Check poster prompt quality if requested
+            checks["text"] = asyncio.to_thread(self._check_text_quality, generated_text)
         if "poster" in output_types:
-            poster_score = self._check_poster_quality(poster_prompt)
-            quality_scores["poster"] = poster_score
-
-        # Check video script quality if requested
+            checks["poster"] = asyncio.to_thread(self._check_poster_quality, poster_prompt)
         if "video" in output_types:
-            video_score = self._check_video_quality(video_script, video_gif_url)
-            quality_scores["video"] = video_score
+            checks["video"] = asyncio.to_thread(self._check_video_quality, video_script, video_gif_url)
+
+        quality_scores = dict(zip(checks, await asyncio.gather(*checks.values())))
 
         # Overall assessment
         overall_score = sum(quality_scores.values()) / len(quality_scores) if quality_scores else 5.0
@@ -853,6 +893,7 @@ class QualityAssuranceAgent(BaseAgent):
         return {
             **state,
             "quality_scores": quality_scores,
+            "overall_quality": overall_score if quality_scores else None,
             "validation_feedback": validation_feedback,
             "qa_notes": f"Overall quality score: {overall_score:.1f}/10 for requested outputs: {', '.join(output_types)}",
             # Set final outputs when QA completes successfully
@@ -872,13 +913,14 @@ class QualityAssuranceAgent(BaseAgent):
         elif len(text) > 50:
             score += 1
 
-        if self.context.platform.lower() in text.lower():
+        if self.context.platform_lc in text.lower():
             score += 1
 
-        if "#" in text or "!" in text or "?" in text:
+        if ENGAGEMENT_MARKS_REGEX.search(text):
             score += 1
 
-        if any(ord(char) > 127 for char in text):
+        # Non-ASCII text usually means emoji
+        if not text.isascii():
             score += 1
 
         return min(score, 10.0)
@@ -889,13 +931,14 @@ class QualityAssuranceAgent(BaseAgent):
         if not prompt or "Error" in prompt:
             return 3.0
 
-        if any(word in prompt.lower() for word in ["color", "layout", "typography", "design", "visual", "poster"]):
+        prompt_lc = prompt.lower()
+        if POSTER_DESIGN_TERMS_REGEX.search(prompt_lc):
             score += 2
 
-        if self.context.platform.lower() in prompt.lower():
+        if self.context.platform_lc in prompt_lc:
             score += 2
 
-        if self.context.brand_guidelines and self.context.brand_guidelines.lower() in prompt.lower():
+        if self.context.brand_lc and self.context.brand_lc in prompt_lc:
             score += 1
 
         return min(score, 10.0)
@@ -919,7 +962,8 @@ class QualityAssuranceAgent(BaseAgent):
             score += 1.5
 
         # Check for visual descriptions
-        if "visual" in script.lower() or "scene" in script.lower():
+        script_lc = script.lower()
+        if "visual" in script_lc or "scene" in script_lc:
             score += 1
 
         # Bonus points if actual video GIF was generated
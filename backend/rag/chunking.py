@@ -3,19 +3,71 @@ Text chunking utilities for optimal RAG retrieval
 Implements various chunking strategies for different content types
 """
 
+import os
 import re
 import math
+import multiprocessing
+import threading
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+try:
+    import numpy as np
+    from numba import njit
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    _NUMBA_AVAILABLE = False
+
+# Below this many documents, create_chunks_for_documents skips the process pool
+PARALLEL_CHUNKING_MIN_DOCS = 64
+
+# Worker pool for large chunking jobs, started on first use and shared by later calls
+_chunking_pool: Optional[ProcessPoolExecutor] = None
+_chunking_pool_lock = threading.Lock()
+
+# Optimal chunk sizes; a platform size takes precedence over a content type size
+PLATFORM_CHUNK_SIZES = {
+    "twitter": 280,     # Twitter's character limit
+    "instagram": 400,   # Optimal for Instagram captions
+    "facebook": 600,    # Good for Facebook posts
+    "linkedin": 800     # Suitable for LinkedIn articles
+}
+CONTENT_TYPE_CHUNK_SIZES = {
+    "short_form": 300,
+    "long_form": 1000,
+    "technical": 600
+}
+
+# Sentence endings that make acceptable chunk breaks when no separator is close by
+SENTENCE_END_REGEX = re.compile(r'[.!?] |\n')
+# Splits text into sentences, keeping the punctuation as separate items
+SENTENCE_SPLIT_REGEX = re.compile(r'([.!?]+)')
+# Markdown header line: level markers and title
+HEADER_REGEX = re.compile(r'^(#{1,6})\s+(.+)$')
+
+def _last_boundary(boundaries: List[int], lower: int, upper: int) -> Optional[int]:
+    """Return the largest boundary in (lower, upper], or None"""
+    i = bisect_right(boundaries, upper)
+    if i and boundaries[i - 1] > lower:
+        return boundaries[i - 1]
+    return None
 
 @dataclass
 class Chunk:
-    """Represents a text chunk with metadata"""
+    """Represents a text chunk with metadata
+
+    metadata is shared with the caller and with sibling chunks, so treat it as read-only.
+    """
     content: str
     start_index: int
     end_index: int
     metadata: Dict[str, Any]
     chunk_id: str
+    # Sorted unique token ids, filled lazily by calculate_chunk_similarity when numba is available
+    token_ids: Any = field(default=None, repr=False, compare=False)
 
 class TextChunker:
     """Advanced text chunking for RAG optimization"""
@@ -27,6 +79,9 @@ class TextChunker:
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.separator = separator
+        # Compiled once per chunker; chunk_text scans for separators and sentence endings separately,
+        # since a single alternation would drop breaks where the two overlap
+        self._separator_regex = re.compile(re.escape(separator))
 
     def chunk_text(self, text: str, metadata: Optional[Dict[str, Any]] = None) -> List[Chunk]:
         """Chunk text using size-based strategy"""
@@ -36,26 +91,21 @@ class TextChunker:
         chunks = []
         start = 0
 
+        # Find every candidate break once, then snap each chunk end with a binary search
+        separator_ends = [m.end() for m in self._separator_regex.finditer(text)]
+        sentence_ends = [m.end() for m in SENTENCE_END_REGEX.finditer(text)]
+
         while start < len(text):
             # Calculate end position
             end = min(start + self.chunk_size, len(text))
 
             # Try to find a good breaking point
             if end < len(text):
-                # Look for separator within the last 100 characters
-                search_start = max(start, end - 100)
-                separator_pos = text.rfind(self.separator, search_start, end)
-
-                if separator_pos != -1 and separator_pos > start:
-                    end = separator_pos + len(self.separator)
-                else:
-                    # Look for sentence endings
-                    sentence_endings = ['. ', '! ', '? ', '\n']
-                    for ending in sentence_endings:
-                        pos = text.rfind(ending, search_start, end)
-                        if pos != -1 and pos > start:
-                            end = pos + len(ending)
-                            break
+                # Prefer a separator within the last 100 characters, then a sentence ending
+                search_start = max(start + 1, end - 100)
+                end = (_last_boundary(separator_ends, search_start, end)
+                       or _last_boundary(sentence_ends, search_start, end)
+                       or end)
 
             # Extract chunk
             chunk_content = text[start:end].strip()
@@ -64,7 +114,7 @@ class TextChunker:
                     content=chunk_content,
                     start_index=start,
                     end_index=end,
-                    metadata=metadata.copy(),
+                    metadata=metadata,
                     chunk_id=f"chunk_{len(chunks)}"
                 )
                 chunks.append(chunk)
@@ -81,42 +131,45 @@ class TextChunker:
             metadata = {}
 
         # Split into sentences
-        sentences = re.split(r'([.!?]+)', text)
+        sentences = SENTENCE_SPLIT_REGEX.split(text)
         sentences = [s.strip() for s in sentences if s.strip()]
 
         chunks = []
-        current_chunk = ""
+        # Collect sentence parts and join once per chunk instead of growing a string
+        current_parts: List[str] = []
+        current_len = 0
         current_start = 0
 
-        for i, sentence in enumerate(sentences):
-            # Add sentence to current chunk
-            potential_chunk = current_chunk + sentence if current_chunk else sentence
-
+        for sentence in sentences:
             # Check if adding this sentence would exceed size limit
-            if len(potential_chunk) > max_chunk_size and current_chunk:
+            if current_len + len(sentence) > max_chunk_size and current_parts:
                 # Save current chunk
+                current_chunk = "".join(current_parts)
                 chunk = Chunk(
                     content=current_chunk.strip(),
                     start_index=current_start,
-                    end_index=current_start + len(current_chunk),
-                    metadata=metadata.copy(),
+                    end_index=current_start + current_len,
+                    metadata=metadata,
                     chunk_id=f"chunk_{len(chunks)}"
                 )
                 chunks.append(chunk)
 
-                # Start new chunk
-                current_chunk = sentence
-                current_start = current_start + len(current_chunk)
+                # Start new chunk where the saved one ended
+                current_start += current_len
+                current_parts = [sentence]
+                current_len = len(sentence)
             else:
-                current_chunk = potential_chunk
+                current_parts.append(sentence)
+                current_len += len(sentence)
 
         # Add final chunk
-        if current_chunk:
+        if current_parts:
+            current_chunk = "".join(current_parts)
             chunk = Chunk(
                 content=current_chunk.strip(),
                 start_index=current_start,
-                end_index=current_start + len(current_chunk),
-                metadata=metadata.copy(),
+                end_index=current_start + current_len,
+                metadata=metadata,
                 chunk_id=f"chunk_{len(chunks)}"
             )
             chunks.append(chunk)
@@ -128,20 +181,19 @@ class TextChunker:
         if not metadata:
             metadata = {}
 
-        paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
-        chunks = []
+        # Strip each paragraph once and keep the non-empty results
+        paragraphs = [paragraph for p in text.split('\n\n') if (paragraph := p.strip())]
 
-        for i, paragraph in enumerate(paragraphs):
-            chunk = Chunk(
+        return [
+            Chunk(
                 content=paragraph,
                 start_index=0,  # Would need original text to calculate properly
                 end_index=len(paragraph),
-                metadata=metadata.copy(),
+                metadata=metadata,
                 chunk_id=f"chunk_{i}"
             )
-            chunks.append(chunk)
-
-        return chunks
+            for i, paragraph in enumerate(paragraphs)
+        ]
 
     def chunk_markdown_sections(self, text: str, metadata: Optional[Dict[str, Any]] = None) -> List[Chunk]:
         """Chunk markdown content by sections (headers)"""
@@ -151,17 +203,18 @@ class TextChunker:
         chunks = []
         lines = text.split('\n')
 
-        current_section = ""
+        # Lines of the section being built; joined once when the section ends
+        current_lines: List[str] = []
         current_start = 0
-        current_metadata = metadata.copy()
+        current_metadata = metadata
 
         for i, line in enumerate(lines):
             # Check if line is a header
             if line.startswith('#'):
                 # Save previous section if it exists
-                if current_section.strip():
+                if current_section := "\n".join(current_lines).strip():
                     chunk = Chunk(
-                        content=current_section.strip(),
+                        content=current_section,
                         start_index=current_start,
                         end_index=i,
                         metadata=current_metadata,
@@ -170,25 +223,27 @@ class TextChunker:
                     chunks.append(chunk)
 
                 # Start new section
-                current_section = line + '\n'
+                current_lines = [line]
                 current_start = i
 
                 # Extract section level and title
-                header_match = re.match(r'^(#{1,6})\s+(.+)$', line)
+                header_match = HEADER_REGEX.match(line)
                 if header_match:
                     level = len(header_match.group(1))
                     title = header_match.group(2)
-                    current_metadata.update({
+                    # New dict per section; earlier chunks keep their own titles
+                    current_metadata = {
+                        **metadata,
                         "section_level": level,
                         "section_title": title
-                    })
+                    }
             else:
-                current_section += line + '\n'
+                current_lines.append(line)
 
         # Add final section
-        if current_section.strip():
+        if current_section := "\n".join(current_lines).strip():
             chunk = Chunk(
-                content=current_section.strip(),
+                content=current_section,
                 start_index=current_start,
                 end_index=len(lines),
                 metadata=current_metadata,
@@ -221,57 +276,105 @@ class AdaptiveChunker:
     def get_optimal_chunk_size(self, content_type: str, platform: str = None) -> int:
         """Get optimal chunk size based on content type and platform"""
 
-        # Platform-specific chunk sizes
-        if platform == "twitter":
-            return 280  # Twitter's character limit
-        elif platform == "instagram":
-            return 400  # Optimal for Instagram captions
-        elif platform == "facebook":
-            return 600  # Good for Facebook posts
-        elif platform == "linkedin":
-            return 800  # Suitable for LinkedIn articles
-
-        # Content type specific sizes
-        if content_type == "short_form":
-            return 300
-        elif content_type == "long_form":
-            return 1000
-        elif content_type == "technical":
-            return 600
-        else:
-            return 512  # Default
+        return PLATFORM_CHUNK_SIZES.get(platform) or CONTENT_TYPE_CHUNK_SIZES.get(content_type, 512)
+
+def _chunk_document(doc: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Chunk a single document; module-level so process pool workers can pickle it"""
+    content = doc.get("content", "")
+    content_type = doc.get("content_type", "text")
+    metadata = doc.get("metadata", {})
+
+    chunks = AdaptiveChunker().chunk_content(content, content_type, metadata)
+
+    return [
+        {
+            "content": chunk.content,
+            "metadata": {
+                **chunk.metadata,
+                "original_id": doc.get("id"),
+                "chunk_id": chunk.chunk_id,
+                "chunk_start": chunk.start_index,
+                "chunk_end": chunk.end_index
+            },
+            "id": f"{doc.get('id', 'unknown')}_{chunk.chunk_id}"
+        }
+        for chunk in chunks
+    ]
+
+def _get_chunking_pool() -> ProcessPoolExecutor:
+    """Return the shared chunking pool, starting it on first use
+
+    Workers are spawned rather than forked: the server process already runs torch, SentenceTransformer
+    and Chroma threads, and forking it can deadlock a child on a lock one of those threads held.
+    Spawned workers import the rag package once each, so the pool is kept for later calls.
+    """
+    global _chunking_pool
+    with _chunking_pool_lock:
+        if _chunking_pool is None:
+            _chunking_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        return _chunking_pool
 
 def create_chunks_for_documents(documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Create chunks for a list of documents"""
 
-    chunker = AdaptiveChunker()
-    chunked_documents = []
-
-    for doc in documents:
-        content = doc.get("content", "")
-        content_type = doc.get("content_type", "text")
-        metadata = doc.get("metadata", {})
-
-        chunks = chunker.chunk_content(content, content_type, metadata)
-
-        for chunk in chunks:
-            chunked_documents.append({
-                "content": chunk.content,
-                "metadata": {
-                    **chunk.metadata,
-                    "original_id": doc.get("id"),
-                    "chunk_id": chunk.chunk_id,
-                    "chunk_start": chunk.start_index,
-                    "chunk_end": chunk.end_index
-                },
-                "id": f"{doc.get('id', 'unknown')}_{chunk.chunk_id}"
-            })
+    # Small batches are cheaper to chunk inline than to ship to worker processes
+    if len(documents) < PARALLEL_CHUNKING_MIN_DOCS:
+        per_document = map(_chunk_document, documents)
+        return [chunk for chunks in per_document for chunk in chunks]
+
+    global _chunking_pool
+    pool = _get_chunking_pool()
+    workers = os.cpu_count() or 1
+    try:
+        per_document = pool.map(_chunk_document, documents,
+                                chunksize=max(1, len(documents) // (workers * 4)))
+        return [chunk for chunks in per_document for chunk in chunks]
+    except BrokenProcessPool:
+        # A worker died; drop the pool so the next call starts a fresh one, and chunk this batch inline
+        with _chunking_pool_lock:
+            if _chunking_pool is pool:
+                _chunking_pool = None
+        per_document = map(_chunk_document, documents)
+        return [chunk for chunks in per_document for chunk in chunks]
+
+if _NUMBA_AVAILABLE:
+    # Token -> integer id, shared by every chunk so their id arrays are comparable
+    _TOKEN_VOCAB: Dict[str, int] = {}
+
+    @njit(cache=True)
+    def _sorted_jaccard(a, b) -> float:
+        """Jaccard similarity of two sorted arrays of unique ids via a merge walk"""
+        i = j = inter = 0
+        while i < len(a) and j < len(b):
+            if a[i] == b[j]:
+                inter += 1
+                i += 1
+                j += 1
+            elif a[i] < b[j]:
+                i += 1
+            else:
+                j += 1
+        union = len(a) + len(b) - inter
+        return inter / union if union > 0 else 0.0
 
-    return chunked_documents
+    def _chunk_token_ids(chunk: Chunk):
+        """Return the chunk's sorted unique token ids, computing them on first use"""
+        if chunk.token_ids is None:
+            ids = [_TOKEN_VOCAB.setdefault(token, len(_TOKEN_VOCAB)) for token in chunk.content.lower().split()]
+            chunk.token_ids = np.unique(np.array(ids, dtype=np.int32))
+        return chunk.token_ids
 
 def calculate_chunk_similarity(chunk1: Chunk, chunk2: Chunk) -> float:
     """Calculate similarity between two chunks (simple overlap-based)"""
 
+    if _NUMBA_AVAILABLE:
+        tokens1 = _chunk_token_ids(chunk1)
+        tokens2 = _chunk_token_ids(chunk2)
+        if not len(tokens1) or not len(tokens2):
+            return 0.0
+        return _sorted_jaccard(tokens1, tokens2)
+
     # Simple Jaccard similarity for tokens
     tokens1 = set(chunk1.content.lower().split())
     tokens2 = set(chunk2.content.lower().split())
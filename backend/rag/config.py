@@ -4,12 +4,37 @@ Settings for models, vector store, and agent parameters
 """
 
 import os
-from typing import Dict, Any, Optional
-from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+from dataclasses import dataclass, field
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Per-platform defaults; read-only views so they can be shared across configs and threads
+DEFAULT_PLATFORM_CONFIGS: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    "instagram": MappingProxyType({
+        "max_chars": 2200,
+        "hashtags_per_post": 10,
+        "visual_focus": "high"
+    }),
+    "facebook": MappingProxyType({
+        "max_chars": 63206,
+        "hashtags_per_post": 5,
+        "visual_focus": "medium"
+    }),
+    "twitter": MappingProxyType({
+        "max_chars": 280,
+        "hashtags_per_post": 3,
+        "visual_focus": "low"
+    }),
+    "linkedin": MappingProxyType({
+        "max_chars": 3000,
+        "hashtags_per_post": 3,
+        "visual_focus": "medium"
+    })
+})
+
 @dataclass
 class RAGConfig:
     """Configuration for the RAG system"""
@@ -32,33 +57,8 @@ class RAGConfig:
     min_quality_score: float = 7.0
     min_retrieval_similarity: float = 0.7
 
-    # Platform-specific settings
-    platform_configs: Dict[str, Dict[str, Any]] = None
-
-    def __post_init__(self):
-        if self.platform_configs is None:
-            self.platform_configs = {
-                "instagram": {
-                    "max_chars": 2200,
-                    "hashtags_per_post": 10,
-                    "visual_focus": "high"
-                },
-                "facebook": {
-                    "max_chars": 63206,
-                    "hashtags_per_post": 5,
-                    "visual_focus": "medium"
-                },
-                "twitter": {
-                    "max_chars": 280,
-                    "hashtags_per_post": 3,
-                    "visual_focus": "low"
-                },
-                "linkedin": {
-                    "max_chars": 3000,
-                    "hashtags_per_post": 3,
-                    "visual_focus": "medium"
-                }
-            }
+    # Platform-specific settings, shared read-only by every config instance
+    platform_configs: Mapping[str, Mapping[str, Any]] = field(default_factory=lambda: DEFAULT_PLATFORM_CONFIGS)
 
     @classmethod
     def from_env(cls) -> 'RAGConfig':
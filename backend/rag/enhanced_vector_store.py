@@ -6,13 +6,34 @@ Advanced retrieval and ingestion capabilities
 import asyncio
 from typing import List, Dict, Any, Optional, Tuple
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+
+try:
+    import simsimd
+    _SIMSIMD_AVAILABLE = True
+except ImportError:
+    _SIMSIMD_AVAILABLE = False
 
 from .config import RAGConfig
 from .vector_store import VectorStoreManager, get_vector_store    
 from .knowledge_base import KnowledgeBaseManager, get_knowledge_manager
 from .chunking import AdaptiveChunker, Chunk, create_chunks_for_documents
 
+def _cosine_similarities(query_embedding: np.ndarray, doc_embeddings: np.ndarray) -> np.ndarray:
+    """Cosine similarity of one (1, dim) query against (n, dim) documents, as an (n,) array
+
+    Both sides are unit-normalised at encode time, so without SimSIMD the cosine is a plain dot product.
+    """
+    query_embedding = np.ascontiguousarray(query_embedding, dtype=np.float32)
+    doc_embeddings = np.ascontiguousarray(doc_embeddings, dtype=np.float32)
+
+    if _SIMSIMD_AVAILABLE:
+        return 1.0 - np.asarray(simsimd.cdist(query_embedding, doc_embeddings, metric="cosine")).ravel()
+
+    return doc_embeddings @ query_embedding.ravel()
+
+# Reranked results kept per (query, platform, tone, content_type, n_results); oldest evicted first
+RETRIEVAL_CACHE_SIZE = 256
+
 class EnhancedVectorStore:
     """Enhanced vector store with knowledge base integration"""
 
@@ -23,6 +44,7 @@ class EnhancedVectorStore:
         self.knowledge_manager = get_knowledge_manager(config)
         self.chunker = AdaptiveChunker()
         self.embedding_model = self.vector_store.embedding_model
+        self._retrieval_cache: Dict[Tuple, Tuple[Dict[str, Any], ...]] = {}
 
     def add_knowledge_documents(self, documents: List[Dict[str, Any]]) -> bool:
         """Add knowledge documents with chunking"""
@@ -30,21 +52,43 @@ class EnhancedVectorStore:
             # Chunk documents for better retrieval
             chunked_docs = create_chunks_for_documents(documents)
 
-            # Add chunks to vector store
-            return self.vector_store.add_documents(chunked_docs)
+            # Add chunks to vector store; cached retrievals may now be stale
+            added = self.vector_store.add_documents(chunked_docs)
+            if added:
+                self.clear_retrieval_cache()
+            return added
 
         except Exception as e:
             print(f"Error adding knowledge documents: {e}")
             return False
 
+    def clear_retrieval_cache(self) -> None:
+        """Forget cached retrievals after the knowledge base changes"""
+        self._retrieval_cache.clear()
+
+    def encode_batch(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """Encode texts in batches into normalised float32 embeddings of shape (len(texts), dim)"""
+        return self.embedding_model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+
     def retrieve_with_context(self, query: str, platform: str = None,
                             tone: str = None, content_type: str = "all",
                             n_results: int = 5) -> List[Dict[str, Any]]:
         """Retrieve context with platform and tone filtering"""
 
+        cache_key = (query, platform, tone, content_type, n_results)
+        cached = self._retrieval_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+
         try:
-            # Build query embeddings
-            query_embedding = self.embedding_model.encode([query]).tolist()
+            # Build the query embedding once; the reranker reuses it
+            query_embedding = self.encode_batch([query])
 
             # Build where clause for filtering
             where_clause = {}
@@ -59,63 +103,77 @@ class EnhancedVectorStore:
             results = self.vector_store.collection.query(
                 query_embeddings=query_embedding,
                 n_results=n_results * 2,  # Get more results for reranking
-                where=where_clause if where_clause else None
+                where=where_clause if where_clause else None,
+                # Stored document vectors let the reranker skip re-encoding
+                include=["documents", "metadatas", "distances", "embeddings"]
             )
 
             if not results["documents"] or not results["documents"][0]:
                 return []
 
             # Rerank results based on relevance and diversity
-            reranked_results = self._rerank_results(query, results, n_results)
+            reranked_results = self._rerank_results(query_embedding, results, n_results, platform, tone)
 
             if not reranked_results:
                 return []
 
+            if len(self._retrieval_cache) >= RETRIEVAL_CACHE_SIZE:
+                del self._retrieval_cache[next(iter(self._retrieval_cache))]
+            self._retrieval_cache[cache_key] = tuple(reranked_results)
+            return reranked_results
+
         except Exception as e:
             print(f"Error retrieving context: {e}")
             return []
 
-    def _rerank_results(self, query: str, results: Dict[str, Any],
-                       n_results: int) -> List[Dict[str, Any]]:
-        """Rerank search results for better relevance"""
+    def _rerank_results(self, query_embedding: np.ndarray, results: Dict[str, Any],
+                       n_results: int, target_platform: Optional[str] = None,
+                       target_tone: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Rerank search results for better relevance
+
+        query_embedding is the (1, dim) array the results were retrieved with.
+        Results matching the requested platform and tone get a score boost.
+        """
 
         documents = results["documents"][0]
         metadatas = results["metadatas"][0]
         distances = results["distances"][0]
+        doc_embeddings = results["embeddings"][0]
 
         # Calculate query-document similarity scores
-        query_embedding = self.embedding_model.encode([query])
-        doc_embeddings = self.embedding_model.encode(documents)
-
-        similarities = cosine_similarity(query_embedding, doc_embeddings)[0]
+        similarities = _cosine_similarities(query_embedding, doc_embeddings)
 
         # Combine distance and similarity scores
-        combined_scores = []
-        for i, (doc, metadata, distance, similarity) in enumerate(zip(documents, metadatas, distances, similarities)):
-            # Normalize scores (lower distance is better, higher similarity is better)
-            normalized_distance = 1 / (1 + distance)
-            combined_score = (normalized_distance + similarity) / 2
-
-            # Boost score for exact platform/tone matches
-            if metadata.get("platform") == metadata.get("platform"):  # This is a placeholder
-                combined_score *= 1.2
-
-            combined_scores.append((combined_score, i))
-
-        # Sort by combined score and return top results
-        combined_scores.sort(reverse=True)
-        top_indices = [idx for _, idx in combined_scores[:n_results]]
+        # Normalize scores (lower distance is better, higher similarity is better)
+        normalized_distances = 1.0 / (1.0 + np.asarray(distances, dtype=np.float32))
+        combined_scores = (normalized_distances + similarities) / 2
+
+        # Boost score for exact platform/tone matches
+        matches = np.ones(len(metadatas), dtype=bool)
+        if target_platform:
+            platforms = np.array([metadata.get("platform") for metadata in metadatas], dtype=object)
+            matches &= platforms == target_platform
+        if target_tone:
+            tones = np.array([metadata.get("tone") for metadata in metadatas], dtype=object)
+            matches &= tones == target_tone
+        combined_scores *= np.where(matches, 1.2, 1.0)
+
+        # Select the top results without sorting the whole candidate list
+        k = min(n_results, combined_scores.size)
+        if k <= 0:
+            return []
+        top_indices = np.argpartition(-combined_scores, k - 1)[:k]
+        top_indices = top_indices[np.argsort(-combined_scores[top_indices])]
 
-        reranked_results = []
-        for idx in top_indices:
-            reranked_results.append({
+        return [
+            {
                 "content": documents[idx],
                 "metadata": metadatas[idx],
-                "similarity_score": similarities[idx],
+                "similarity_score": float(similarities[idx]),
                 "distance": distances[idx]
-            })
-
-        return reranked_results
+            }
+            for idx in top_indices
+        ]
 
     def get_relevant_templates(self, platform: str, tone: str,
                               n_results: int = 3) -> List[Dict[str, Any]]:
@@ -165,9 +223,12 @@ class EnhancedVectorStore:
             if loop.is_running():
                 # If loop is already running, create a task
                 task = asyncio.create_task(_ingest())
-                return task.result()
+                ingested = task.result()
             else:
-                return asyncio.run(_ingest())
+                ingested = asyncio.run(_ingest())
+            if ingested:
+                self.clear_retrieval_cache()
+            return ingested
         except Exception as e:
             print(f"Error ingesting historical data: {e}")
             return 0
@@ -179,6 +240,7 @@ class EnhancedVectorStore:
             success = self.knowledge_manager.seed_initial_knowledge_base()
 
             if success:
+                self.clear_retrieval_cache()
                 print("✅ Comprehensive knowledge base seeded successfully")
                 stats = self.knowledge_manager.get_knowledge_stats()
                 print(f"📊 Knowledge base stats: {stats}")
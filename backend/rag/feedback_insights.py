@@ -1,9 +1,41 @@
 from __future__ import annotations
 
+import logging
+import re
 from collections import Counter
 from typing import Any, Dict, List, Optional
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import IndexModel
+
+logger = logging.getLogger(__name__)
+
+# Only the fields the insights read are fetched from MongoDB
+FEEDBACK_PROJECTION = {"_id": 0, "rating": 1, "message": 1, "tags": 1}
+
+# Words of four or more letters, matched against lowercased feedback text
+KEYWORD_REGEX = re.compile(r"[a-z]{4,}")
+# Filler words that would otherwise dominate the keyword counts
+KEYWORD_STOPWORDS = frozenset({
+    "this", "that", "with", "have", "from", "they", "them", "their", "there",
+    "were", "been", "very", "just", "really", "would", "could", "should",
+    "about", "what", "when", "your", "more", "some", "than", "into", "also",
+    "much", "will", "like", "only",
+})
+
+async def ensure_feedback_indexes(db: AsyncIOMotorDatabase) -> None:
+    """Create the indexes that serve get_feedback_insights' filters with the newest-first sort.
+
+    The platform filter is always present, so there is no tone-only index; (platform, _id)
+    covers requests without a tone, which (platform, tone, _id) can only serve with an in-memory sort.
+    """
+    try:
+        await db.feedback.create_indexes([
+            IndexModel([("platform", 1), ("tone", 1), ("_id", -1)]),
+            IndexModel([("platform", 1), ("_id", -1)]),
+        ])
+    except Exception as e:
+        logger.warning("Could not create feedback indexes: %s", e)
 
 
 async def get_feedback_insights(
@@ -18,7 +50,7 @@ async def get_feedback_insights(
         query["tone"] = tone
 
     cursor = (
-        db.feedback.find(query)
+        db.feedback.find(query, FEEDBACK_PROJECTION)
         .sort("_id", -1)
         .limit(limit)
     )
@@ -34,27 +66,41 @@ async def get_feedback_insights(
             "summary": "No recent feedback available."
         }
 
-    ratings = [doc.get("rating", 0) for doc in feedback_docs if isinstance(doc.get("rating", None), (int, float))]
-    avg_rating = sum(ratings) / len(ratings) if ratings else None
-
-    positive_highlights = [doc.get("message", "") for doc in feedback_docs if doc.get("rating", 0) >= 4][:3]
-    improvement_suggestions = [doc.get("message", "") for doc in feedback_docs if doc.get("rating", 0) <= 2][:3]
-
-    # Collect simple keyword signals from feedback tags/messages
+    # Single pass over the documents; highlight lists stop growing at three entries
+    rating_total = 0.0
+    rating_count = 0
+    positive_highlights: List[str] = []
+    improvement_suggestions: List[str] = []
+    messages: List[str] = []
     keyword_counter: Counter[str] = Counter()
     for doc in feedback_docs:
+        rating = doc.get("rating", 0)
+        rating_type = type(rating)
+        if rating_type is int or rating_type is float:
+            rating_total += rating
+            rating_count += 1
+        else:
+            rating = 0
+
         message = doc.get("message", "")
-        tags = doc.get("tags", [])
-        words = []
+        if rating >= 4:
+            if len(positive_highlights) < 3:
+                positive_highlights.append(message)
+        elif rating <= 2 and len(improvement_suggestions) < 3:
+            improvement_suggestions.append(message)
+
         if isinstance(message, str):
-            words.extend(
-                word.lower()
-                for word in message.split()
-                if len(word) > 3
-            )
+            messages.append(message)
+        tags = doc.get("tags")
         if isinstance(tags, list):
-            words.extend(tag.lower() for tag in tags if isinstance(tag, str))
-        keyword_counter.update(words)
+            keyword_counter.update(tag.lower() for tag in tags if isinstance(tag, str))
+
+    avg_rating = rating_total / rating_count if rating_count else None
+
+    # Collect simple keyword signals from feedback tags/messages
+    keyword_counter.update(
+        word for word in KEYWORD_REGEX.findall(" ".join(messages).lower()) if word not in KEYWORD_STOPWORDS
+    )
 
     common_keywords = [word for word, _ in keyword_counter.most_common(5)]
 
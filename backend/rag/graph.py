@@ -4,12 +4,18 @@ Orchestrates multi-agent generation with sequential and parallel processing
 """
 
 import asyncio
-from typing import Dict, List, Any, TypedDict, Optional
+import logging
+from contextvars import ContextVar
+from dataclasses import replace
+from types import MappingProxyType
+from typing import Dict, List, Any, Literal, Mapping, TypedDict, Optional
 from langgraph.graph import StateGraph, END
+from langgraph.types import Command
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from .agents import (
     AgentContext,
+    BaseAgent,
     ContentResearcher,
     CopywriterAgent,
     VisualDesignerAgent,
@@ -21,6 +27,11 @@ from .agents import (
 
 from .enhanced_vector_store import get_enhanced_vector_store
 
+logger = logging.getLogger(__name__)
+
+# One structured record per node run; arguments are only formatted when the record is emitted
+_NODE_DONE = "node=%s status=%s detail=%s"
+
 class GenerationState(TypedDict):
     """State structure for the generation workflow"""
     input: str
@@ -40,6 +51,7 @@ class GenerationState(TypedDict):
     logo_size: Optional[int]
     logo_integration_notes: Optional[str]
     logo_error: Optional[str]
+    logo_save_task: Optional[Any]
     poster_finalized: bool
     finalization_notes: Optional[str]
 
@@ -70,6 +82,7 @@ class GenerationState(TypedDict):
 
     # Quality assurance
     quality_scores: Dict[str, float]
+    overall_quality: Optional[float]
     validation_feedback: Dict[str, str]
     qa_notes: str
 
@@ -89,16 +102,133 @@ class GenerationState(TypedDict):
     errors: List[str]
     retry_count: int
 
+# Defaults for every state key; run() overlays the caller's state on top in a single merge.
+# The list and dict values are shared between runs, which is safe because nodes replace them rather than mutate them.
+_DEFAULT_STATE: Mapping[str, Any] = MappingProxyType({
+    "input": "",
+    "platform": "",
+    "tone": "",
+    "brand_guidelines": None,
+    "output_types": [],
+    "logo_data": None,
+    "logo_position": "top-right",
+    "logo_file": None,
+    "logo_processed": False,
+    "logo_id": None,
+    "logo_path": None,
+    "logo_filename": None,
+    "logo_size": None,
+    "logo_integration_notes": None,
+    "logo_error": None,
+    "logo_save_task": None,
+    "poster_finalized": False,
+    "finalization_notes": None,
+    "research_context": [],
+    "research_summary": "",
+    "generated_text": "",
+    "poster_prompt": "",
+    "poster_url": None,
+    "poster_file_path": None,
+    "poster_filename": None,
+    "poster_generation_notes": None,
+    "poster_error": None,
+    "video_script": "",
+    "video_gif_url": None,
+    "video_gif_file_path": None,
+    "video_gif_filename": None,
+    "video_generation_notes": None,
+    "video_error": None,
+    "video_frame_prompts": None,
+    "copywriter_notes": "",
+    "visual_designer_notes": "",
+    "video_scriptwriter_notes": "",
+    "quality_scores": {},
+    "overall_quality": None,
+    "validation_feedback": {},
+    "qa_notes": "",
+    "final_text": "",
+    "final_poster_prompt": "",
+    "final_video_script": "",
+    "feedback_summary": None,
+    "feedback_highlights": [],
+    "feedback_suggestions": [],
+    "feedback_keywords": [],
+    "feedback_avg_rating": None,
+    "errors": [],
+    "retry_count": 0
+})
+
+# QA results keyed on the outputs being scored, so refinement passes over unchanged outputs skip re-scoring
+QA_CACHE_SIZE = 256
+_qa_cache: Dict[tuple, Dict[str, Any]] = {}
+
+def _qa_cache_key(state: GenerationState) -> tuple:
+    """The outputs QualityAssuranceAgent scores, plus the platform and brand its scores depend on"""
+    return (
+        state["platform"],
+        state.get("brand_guidelines"),
+        tuple(state.get("output_types", ())),
+        state.get("generated_text", ""),
+        state.get("poster_prompt", ""),
+        state.get("video_script", ""),
+        state.get("video_gif_url")
+    )
+
+class _RunScope:
+    """Per-run state shared by every node of one workflow run
+
+    LangGraph runs each node in a copy of the caller's contextvars, so nodes update this
+    object in place rather than re-setting the context variable.
+    """
+    __slots__ = ("context", "agents")
+
+    def __init__(self, context: AgentContext):
+        self.context = context
+        # Most recent agent of each class; reused while it still holds the same context object
+        self.agents: Dict[type, BaseAgent] = {}
+
+# Scope of the workflow run in progress; set by GenerationGraph.run
+_run_scope: ContextVar[Optional[_RunScope]] = ContextVar("generation_run_scope", default=None)
+
+def _state_updates(before: GenerationState, after: GenerationState) -> Dict[str, Any]:
+    """Keys an agent added or replaced relative to the state it was given"""
+    return {key: value for key, value in after.items() if key not in before or before[key] is not value}
+
 class GenerationGraph:
     """Main orchestration graph for multi-agent generation"""
 
     def __init__(self, model_name: str = "microsoft/DialoGPT-medium"):
         self.model_name = model_name
+        # Resolved once per graph; every node's AgentContext reuses them
         self.vector_store = get_enhanced_vector_store()
         self.embedding_model = self.vector_store.embedding_model
         self.graph = self._create_graph()
         
     def _get_agent_context(self, state: GenerationState) -> AgentContext:
+        """Return the run's shared agent context, replaced once for the run when the logo inputs change"""
+        scope = _run_scope.get()
+        if scope is None:
+            return self._build_agent_context(state)
+
+        context = scope.context
+        logo_data = state.get("logo_data")
+        logo_position = state.get("logo_position", "top-right")
+        if context.logo_data is not logo_data or context.logo_position != logo_position:
+            context = scope.context = replace(context, logo_data=logo_data, logo_position=logo_position)
+        return context
+
+    def _get_agent(self, agent_cls: type, context: AgentContext) -> BaseAgent:
+        """Return the run's pooled agent for this context, creating one when the context has changed"""
+        scope = _run_scope.get()
+        if scope is None:
+            return agent_cls(context)
+
+        agent = scope.agents.get(agent_cls)
+        if agent is None or agent.context is not context:
+            agent = scope.agents[agent_cls] = agent_cls(context)
+        return agent
+
+    def _build_agent_context(self, state: GenerationState) -> AgentContext:
         """Create a consistent agent context from the current state"""
         return AgentContext(
             platform=state["platform"],
@@ -124,329 +254,244 @@ class GenerationGraph:
         workflow.add_node("research", self._research_node)
         workflow.add_node("text_generation", self._text_generation_node)
         workflow.add_node("logo_integration", self._logo_integration_node)
-        workflow.add_node("poster_generation", self._poster_generation_node)
+        workflow.add_node("media_generation", self._media_generation_node)
         workflow.add_node("poster_finalization", self._poster_finalization_node)
-        workflow.add_node("video_generation", self._video_generation_node)
         workflow.add_node("quality_assurance", self._quality_assurance_node)
         workflow.add_node("refinement", self._refinement_node)
 
-        # Define the flow - Sequential
+        # Define the flow - Sequential, with poster and video generated together in media_generation
         workflow.set_entry_point("research")
         workflow.add_edge("research", "text_generation")
-        workflow.add_edge("text_generation", "logo_integration")
-        workflow.add_edge("logo_integration", "poster_generation")
-        workflow.add_edge("poster_generation", "poster_finalization")
-        workflow.add_edge("poster_finalization", "video_generation")
-        workflow.add_edge("video_generation", "quality_assurance")
 
-        # Quality assurance -> refinement (if needed)
+        # Media nodes only run when a poster or video was requested
         workflow.add_conditional_edges(
-            "quality_assurance",
-            self._should_refine,
+            "text_generation",
+            self._route_after_text,
             {
-                "refine": "refinement",
-                "complete": END
+                "media": "logo_integration",
+                "skip": "quality_assurance"
+            }
+        )
+        workflow.add_edge("logo_integration", "media_generation")
+        workflow.add_conditional_edges(
+            "media_generation",
+            self._route_after_media,
+            {
+                "finalize": "poster_finalization",
+                "skip": "quality_assurance"
             }
         )
+        workflow.add_edge("poster_finalization", "quality_assurance")
 
-        # Refinement can go back to quality assurance or complete
+        # Quality assurance -> refinement (if needed)
         workflow.add_conditional_edges(
-            "refinement",
-            self._should_continue_refinement,
+            "quality_assurance",
+            self._should_refine,
             {
-                "continue": "quality_assurance",
+                "refine": "refinement",
                 "complete": END
             }
         )
 
+        # Refinement routes itself back to quality assurance or to the end via Command
+
         return workflow.compile()
 
-    def _research_node(self, state: GenerationState) -> GenerationState:
+    async def _research_node(self, state: GenerationState) -> GenerationState:
         """Execute content research"""
         try:
             context = self._get_agent_context(state)
-            researcher = ContentResearcher(context)
-            new_state = asyncio.run(researcher.execute(state))
+            researcher = self._get_agent(ContentResearcher, context)
+            new_state = await researcher.execute(state)
             return new_state
         except Exception as e:
             return {
-                **state,
                 "errors": state.get("errors", []) + [f"Research error: {str(e)}"]
             }
 
-    def _text_generation_node(self, state: GenerationState) -> GenerationState:
+    async def _text_generation_node(self, state: GenerationState) -> GenerationState:
         """Execute text generation"""
         try:
             context = self._get_agent_context(state)
-            copywriter = CopywriterAgent(context)
-            new_state = asyncio.run(copywriter.execute(state))
+            copywriter = self._get_agent(CopywriterAgent, context)
+            new_state = await copywriter.execute(state)
             return new_state
         except Exception as e:
             return {
-                **state,
                 "errors": state.get("errors", []) + [f"Text generation error: {str(e)}"]
             }
 
-    def _logo_integration_node(self, state: GenerationState) -> GenerationState:
+    async def _logo_integration_node(self, state: GenerationState) -> GenerationState:
         """Execute logo integration"""
         try:
-            print("🎨 Logo Integration Node: Starting logo processing...")
-            vector_store = get_enhanced_vector_store()
-            embedding_model = vector_store.embedding_model
-
-            context = AgentContext(
-                platform=state["platform"],
-                tone=state["tone"],
-                brand_guidelines=state.get("brand_guidelines"),
-                input_text=state["input"],
-                vector_store=vector_store.vector_store,
-                embedding_model=embedding_model,
-                logo_data=state.get("logo_data"),
-                logo_position=state.get("logo_position", "top-right")
-            )
-
-            logo_agent = LogoIntegrationAgent(context)
-            new_state = asyncio.run(logo_agent.execute(state))
-
-            print(f"🎨 Logo Integration Node: Completed. Logo processed: {new_state.get('logo_processed', False)}")
+            context = self._get_agent_context(state)
+
+            logo_agent = self._get_agent(LogoIntegrationAgent, context)
+            new_state = await logo_agent.execute(state)
+
+            logger.debug(_NODE_DONE, "logo_integration", "ok", new_state.get("logo_processed", False))
             return new_state
         except Exception as e:
-            print(f"❌ Logo Integration Node: Error - {str(e)}")
+            logger.error(_NODE_DONE, "logo_integration", "error", e)
             return {
-                **state,
                 "errors": state.get("errors", []) + [f"Logo integration error: {str(e)}"],
                 "logo_processed": False,
                 "logo_error": str(e)
             }
 
-    def _poster_generation_node(self, state: GenerationState) -> GenerationState:
-        """Execute poster generation"""
+    async def _poster_finalization_node(self, state: GenerationState) -> GenerationState:
+        """Execute poster finalization"""
         try:
-            vector_store = get_enhanced_vector_store()
-            embedding_model = vector_store.embedding_model
-
-            context = AgentContext(
-                platform=state["platform"],
-                tone=state["tone"],
-                brand_guidelines=state.get("brand_guidelines"),
-                input_text=state["input"],
-                vector_store=vector_store.vector_store,
-                embedding_model=embedding_model,
-                feedback_summary=state.get("feedback_summary"),
-                feedback_highlights=state.get("feedback_highlights"),
-                feedback_suggestions=state.get("feedback_suggestions"),
-                feedback_keywords=state.get("feedback_keywords"),
-                feedback_avg_rating=state.get("feedback_avg_rating"),
-                logo_data=state.get("logo_data"),
-                logo_position=state.get("logo_position", "top-right")
-            )
-
-            designer = VisualDesignerAgent(context)
-            new_state = asyncio.run(designer.execute(state))
+            context = self._get_agent_context(state)
+
+            finalization_agent = self._get_agent(PosterFinalizationAgent, context)
+            new_state = await finalization_agent.execute(state)
+
+            logger.debug(_NODE_DONE, "poster_finalization", "ok", new_state.get("poster_finalized", False))
             return new_state
         except Exception as e:
+            logger.error(_NODE_DONE, "poster_finalization", "error", e)
             return {
-                **state,
-                "errors": state.get("errors", []) + [f"Poster generation error: {str(e)}"]
+                "errors": state.get("errors", []) + [f"Poster finalization error: {str(e)}"],
+                "poster_finalized": False,
+                "finalization_notes": str(e)
             }
 
-    def _poster_finalization_node(self, state: GenerationState) -> GenerationState:
-        """Execute poster finalization"""
+    async def _media_generation_node(self, state: GenerationState) -> GenerationState:
+        """Execute poster and video generation concurrently"""
+        new_state = await self._generate_media(state)
+        logger.debug(_NODE_DONE, "media_generation", "ok",
+                     (new_state.get("poster_url"), new_state.get("video_gif_url")))
+        return new_state
+
+    async def _generate_media(self, state: GenerationState) -> GenerationState:
+        """Run the designer and scriptwriter side by side and merge their updates"""
+        context = self._get_agent_context(state)
+        poster_state, video_state = await asyncio.gather(
+            self._generate_poster(context, state),
+            self._generate_video(context, state)
+        )
+
+        # Only the changed keys go back to LangGraph; the branches write disjoint keys and
+        # errors from both are appended in order
+        errors = state.get("errors", [])
+        return {
+            **_state_updates(state, poster_state),
+            **_state_updates(state, video_state),
+            "errors": errors + poster_state.get("errors", errors)[len(errors):]
+                      + video_state.get("errors", errors)[len(errors):]
+        }
+
+    async def _generate_poster(self, context: AgentContext, state: GenerationState) -> GenerationState:
+        """Execute poster generation"""
         try:
-            print("🎨 Poster Finalization Node: Starting poster finalization...")
-            vector_store = get_enhanced_vector_store()
-            embedding_model = vector_store.embedding_model
-
-            context = AgentContext(
-                platform=state["platform"],
-                tone=state["tone"],
-                brand_guidelines=state.get("brand_guidelines"),
-                input_text=state["input"],
-                vector_store=vector_store.vector_store,
-                embedding_model=embedding_model,
-                logo_data=state.get("logo_data"),
-                logo_position=state.get("logo_position", "top-right")
-            )
-
-            finalization_agent = PosterFinalizationAgent(context)
-            new_state = asyncio.run(finalization_agent.execute(state))
-
-            print(f"🎨 Poster Finalization Node: Completed. Finalized: {new_state.get('poster_finalized', False)}")
-            return new_state
+            designer = self._get_agent(VisualDesignerAgent, context)
+            return await designer.execute(state)
         except Exception as e:
-            print(f"❌ Poster Finalization Node: Error - {str(e)}")
             return {
-                **state,
-                "errors": state.get("errors", []) + [f"Poster finalization error: {str(e)}"],
-                "poster_finalized": False,
-                "finalization_notes": str(e)
+                "errors": state.get("errors", []) + [f"Poster generation error: {str(e)}"]
             }
 
-    def _video_generation_node(self, state: GenerationState) -> GenerationState:
+    async def _generate_video(self, context: AgentContext, state: GenerationState) -> GenerationState:
         """Execute video generation - now generates actual video GIF"""
         try:
-            print("🎬 Video Generation Node: Starting video generation...")
-            vector_store = get_enhanced_vector_store()
-            embedding_model = vector_store.embedding_model
-
-            context = AgentContext(
-                platform=state["platform"],
-                tone=state["tone"],
-                brand_guidelines=state.get("brand_guidelines"),
-                input_text=state["input"],
-                vector_store=vector_store.vector_store,
-                embedding_model=embedding_model,
-                feedback_summary=state.get("feedback_summary"),
-                feedback_highlights=state.get("feedback_highlights"),
-                feedback_suggestions=state.get("feedback_suggestions"),
-                feedback_keywords=state.get("feedback_keywords"),
-                feedback_avg_rating=state.get("feedback_avg_rating"),
-                logo_data=state.get("logo_data"),
-                logo_position=state.get("logo_position", "top-right")
-            )
-
-            scriptwriter = VideoScriptwriterAgent(context)
-            new_state = asyncio.run(scriptwriter.execute(state))
-
-            print(f"🎬 Video Generation Node: Completed. Video URL: {new_state.get('video_gif_url', 'None')[:50]}...")
-            return new_state
+            scriptwriter = self._get_agent(VideoScriptwriterAgent, context)
+            return await scriptwriter.execute(state)
         except Exception as e:
-            print(f"❌ Video Generation Node: Error - {str(e)}")
+            logger.error(_NODE_DONE, "video_generation", "error", e)
             return {
-                **state,
                 "errors": state.get("errors", []) + [f"Video generation error: {str(e)}"],
                 "video_error": str(e)
             }
 
-    def _quality_assurance_node(self, state: GenerationState) -> GenerationState:
+    async def _quality_assurance_node(self, state: GenerationState) -> GenerationState:
         """Execute quality assurance"""
-        print(f"QA Node: Processing state with generated_text: '{state.get('generated_text', '')[:50]}...'")
         try:
-            vector_store = get_enhanced_vector_store()
-            embedding_model = vector_store.embedding_model
-
-            context = AgentContext(
-                platform=state["platform"],
-                tone=state["tone"],
-                brand_guidelines=state.get("brand_guidelines"),
-                input_text=state["input"],
-                vector_store=vector_store.vector_store,
-                embedding_model=embedding_model
-            )
-
-            qa_agent = QualityAssuranceAgent(context)
-            new_state = asyncio.run(qa_agent.execute(state))
-
-            print(f"QA Node: Completed. Final text set to: '{new_state.get('final_text', '')[:50]}...'")
+            cache_key = _qa_cache_key(state)
+            cached = _qa_cache.get(cache_key)
+            if cached is not None:
+                logger.debug(_NODE_DONE, "quality_assurance", "cached", cached.get("overall_quality"))
+                return {
+                    **cached,
+                    "quality_scores": dict(cached["quality_scores"]),
+                    "validation_feedback": dict(cached["validation_feedback"])
+                }
+
+            context = self._get_agent_context(state)
+
+            qa_agent = self._get_agent(QualityAssuranceAgent, context)
+            new_state = await qa_agent.execute(state)
+
+            if len(_qa_cache) >= QA_CACHE_SIZE:
+                del _qa_cache[next(iter(_qa_cache))]
+            _qa_cache[cache_key] = _state_updates(state, new_state)
+
+            logger.debug(_NODE_DONE, "quality_assurance", "ok", new_state.get("overall_quality"))
             return new_state
         except Exception as e:
-            print(f"QA Node: Error - {str(e)}")
+            logger.error(_NODE_DONE, "quality_assurance", "error", e)
             return {
-                **state,
                 "errors": state.get("errors", []) + [f"QA error: {str(e)}"]
             }
 
-    def _refinement_node(self, state: GenerationState) -> GenerationState:
-        """Refine outputs based on QA feedback"""
+    def _refinement_node(self, state: GenerationState) -> Command[Literal["quality_assurance", "__end__"]]:
+        """Refine outputs based on QA feedback and route back to QA while retries remain"""
+        retry_count = state.get("retry_count", 0)
         try:
-            quality_scores = state.get("quality_scores", {})
-            overall_score = sum(quality_scores.values()) / len(quality_scores) if quality_scores else 5.0
+            # Average computed by the QA node; None when nothing was scored
+            overall_score = state.get("overall_quality")
 
-            if overall_score >= 7.0:
-                return {
-                    **state,
+            if overall_score is not None and overall_score >= 7.0:
+                update = {
                     "final_text": state.get("generated_text", ""),
                     "final_poster_prompt": state.get("poster_prompt", ""),
                     "final_video_script": state.get("video_script", "")
                 }
             else:
-                return {
-                    **state,
-                    "retry_count": state.get("retry_count", 0) + 1
-                }
+                retry_count += 1
+                update = {"retry_count": retry_count}
         except Exception as e:
-            return {
-                **state,
-                "errors": state.get("errors", []) + [f"Refinement error: {str(e)}"]
-            }
+            update = {"errors": state.get("errors", []) + [f"Refinement error: {str(e)}"]}
+
+        return Command(update=update, goto=END if retry_count >= 2 else "quality_assurance")
+
+    def _route_after_text(self, state: GenerationState) -> str:
+        """Go through the media nodes only if a poster or video was requested"""
+        output_types = state.get("output_types", ())
+        if "poster" in output_types or "video" in output_types:
+            return "media"
+        return "skip"
+
+    def _route_after_media(self, state: GenerationState) -> str:
+        """Finalize the poster only if one was requested"""
+        if "poster" in state.get("output_types", ()):
+            return "finalize"
+        return "skip"
 
     def _should_refine(self, state: GenerationState) -> str:
         """Determine if refinement is needed"""
-        quality_scores = state.get("quality_scores", {})
-        if not quality_scores:
+        overall_score = state.get("overall_quality")
+        if overall_score is None:
             return "complete"
 
-        overall_score = sum(quality_scores.values()) / len(quality_scores)
-
         if overall_score < 7.0 and state.get("retry_count", 0) < 2:
             return "refine"
         else:
             return "complete"
 
-    def _should_continue_refinement(self, state: GenerationState) -> str:
-        """Determine if refinement should continue"""
-        retry_count = state.get("retry_count", 0)
-        if retry_count >= 2:
-            return "complete"
-        else:
-            return "continue"
-
     async def run(self, initial_state: GenerationState) -> GenerationState:
         """Run the complete generation workflow"""
         try:
-            complete_state = {
-                "input": initial_state.get("input", ""),
-                "platform": initial_state.get("platform", ""),
-                "tone": initial_state.get("tone", ""),
-                "brand_guidelines": initial_state.get("brand_guidelines"),
-                "output_types": initial_state.get("output_types", []),
-                "logo_data": initial_state.get("logo_data"),
-                "logo_position": initial_state.get("logo_position", "top-right"),
-                "logo_file": initial_state.get("logo_file"),
-                "logo_processed": initial_state.get("logo_processed", False),
-                "logo_id": initial_state.get("logo_id"),
-                "logo_path": initial_state.get("logo_path"),
-                "logo_filename": initial_state.get("logo_filename"),
-                "logo_size": initial_state.get("logo_size"),
-                "logo_integration_notes": initial_state.get("logo_integration_notes"),
-                "logo_error": initial_state.get("logo_error"),
-                "poster_finalized": initial_state.get("poster_finalized", False),
-                "finalization_notes": initial_state.get("finalization_notes"),
-                "research_context": initial_state.get("research_context", []),
-                "research_summary": initial_state.get("research_summary", ""),
-                "generated_text": initial_state.get("generated_text", ""),
-                "poster_prompt": initial_state.get("poster_prompt", ""),
-                "poster_url": initial_state.get("poster_url"),
-                "poster_file_path": initial_state.get("poster_file_path"),
-                "poster_filename": initial_state.get("poster_filename"),
-                "poster_generation_notes": initial_state.get("poster_generation_notes"),
-                "poster_error": initial_state.get("poster_error"),
-                "video_script": initial_state.get("video_script", ""),
-                "video_gif_url": initial_state.get("video_gif_url"),
-                "video_gif_file_path": initial_state.get("video_gif_file_path"),
-                "video_gif_filename": initial_state.get("video_gif_filename"),
-                "video_generation_notes": initial_state.get("video_generation_notes"),
-                "video_error": initial_state.get("video_error"),
-                "video_frame_prompts": initial_state.get("video_frame_prompts"),
-                "copywriter_notes": initial_state.get("copywriter_notes", ""),
-                "visual_designer_notes": initial_state.get("visual_designer_notes", ""),
-                "video_scriptwriter_notes": initial_state.get("video_scriptwriter_notes", ""),
-                "quality_scores": initial_state.get("quality_scores", {}),
-                "validation_feedback": initial_state.get("validation_feedback", {}),
-                "qa_notes": initial_state.get("qa_notes", ""),
-                "final_text": initial_state.get("final_text", ""),
-                "final_poster_prompt": initial_state.get("final_poster_prompt", ""),
-                "final_video_script": initial_state.get("final_video_script", ""),
-                "feedback_summary": initial_state.get("feedback_summary"),
-                "feedback_highlights": initial_state.get("feedback_highlights", []),
-                "feedback_suggestions": initial_state.get("feedback_suggestions", []),
-                "feedback_keywords": initial_state.get("feedback_keywords", []),
-                "feedback_avg_rating": initial_state.get("feedback_avg_rating"),
-                "errors": initial_state.get("errors", []),
-                "retry_count": initial_state.get("retry_count", 0)
-            }
-
-            result = await self.graph.ainvoke(complete_state)
+            complete_state: GenerationState = {**_DEFAULT_STATE, **initial_state}
+
+            scope = _RunScope(self._build_agent_context(complete_state))
+            token = _run_scope.set(scope)
+            try:
+                result = await self.graph.ainvoke(complete_state)
+            finally:
+                _run_scope.reset(token)
+                # Drop the run's agents and the logo bytes their context holds
+                scope.agents.clear()
             return result
         except Exception as e:
             return {
@@ -455,9 +500,21 @@ class GenerationGraph:
                 "generated_text": f"Error in generation: {str(e)}"
             }
 
+# Compiled graphs by model name; per-run data lives in the state and _run_scope, so runs can share one
+_generation_graphs: Dict[str, GenerationGraph] = {}
+
 def create_generation_graph(model_name: str = "microsoft/DialoGPT-medium") -> GenerationGraph:
-    """Factory function to create generation graph"""
-    return GenerationGraph(model_name)
+    """Get or create the generation graph for a model"""
+    graph = _generation_graphs.get(model_name)
+    if graph is None:
+        graph = _generation_graphs[model_name] = GenerationGraph(model_name)
+    return graph
+
+def _feedback_strings(items: Optional[List[Any]]) -> List[str]:
+    """Non-empty feedback items as strings, skipping the conversion for items that already are"""
+    if not items:
+        return []
+    return [item if type(item) is str else str(item) for item in items if item]
 
 async def run_generation_workflow(
     input_text: str,
@@ -481,16 +538,13 @@ async def run_generation_workflow(
 
     if feedback_insights:
         feedback_summary = feedback_insights.get("summary")
-        raw_highlights = feedback_insights.get("positive_highlights") or []
-        raw_suggestions = feedback_insights.get("improvement_suggestions") or []
-        raw_keywords = feedback_insights.get("common_keywords") or []
-        feedback_highlights = [str(item) for item in raw_highlights if item]
-        feedback_suggestions = [str(item) for item in raw_suggestions if item]
-        feedback_keywords = [str(item) for item in raw_keywords if item]
+        feedback_highlights = _feedback_strings(feedback_insights.get("positive_highlights"))
+        feedback_suggestions = _feedback_strings(feedback_insights.get("improvement_suggestions"))
+        feedback_keywords = _feedback_strings(feedback_insights.get("common_keywords"))
         avg_rating = feedback_insights.get("avg_rating")
         feedback_avg_rating = float(avg_rating) if avg_rating is not None else None
 
-    # Initialize state
+    # Initialize state; run() fills every other key from _DEFAULT_STATE
     initial_state: GenerationState = {
         "input": input_text,
         "platform": platform,
@@ -500,47 +554,11 @@ async def run_generation_workflow(
         "logo_data": logo_data,
         "logo_position": logo_position,
         "logo_file": logo_file,
-        "logo_processed": False,
-        "logo_id": None,
-        "logo_path": None,
-        "logo_filename": None,
-        "logo_size": None,
-        "logo_integration_notes": None,
-        "logo_error": None,
-        "poster_finalized": False,
-        "finalization_notes": None,
-        "research_context": [],
-        "research_summary": "",
-        "generated_text": "",
-        "poster_prompt": "",
-        "poster_url": None,
-        "poster_file_path": None,
-        "poster_filename": None,
-        "poster_generation_notes": None,
-        "poster_error": None,
-        "video_script": "",
-        "video_gif_url": None,
-        "video_gif_file_path": None,
-        "video_gif_filename": None,
-        "video_generation_notes": None,
-        "video_error": None,
-        "video_frame_prompts": None,
-        "copywriter_notes": "",
-        "visual_designer_notes": "",
-        "video_scriptwriter_notes": "",
-        "quality_scores": {},
-        "validation_feedback": {},
-        "qa_notes": "",
-        "final_text": "",
-        "final_poster_prompt": "",
-        "final_video_script": "",
         "feedback_summary": feedback_summary,
         "feedback_highlights": feedback_highlights,
         "feedback_suggestions": feedback_suggestions,
         "feedback_keywords": feedback_keywords,
-        "feedback_avg_rating": feedback_avg_rating,
-        "errors": [],
-        "retry_count": 0
+        "feedback_avg_rating": feedback_avg_rating
     }
 
     # Create and run the graph
@@ -554,26 +572,27 @@ async def run_generation_workflow(
     final_poster_url = result.get("poster_url")
     final_video_gif_url = result.get("video_gif_url")
 
-    # Print completion summary
-    output_types = result.get("output_types", [])
-    completion_parts = []
-    
-    if "text" in output_types:
-        completion_parts.append(f"Text: '{final_text[:50]}...'")
-    
-    if "poster" in output_types:
-        if final_poster_url:
-            completion_parts.append("Poster: Generated successfully")
-        else:
-            completion_parts.append("Poster: Failed")
-    
-    if "video" in output_types:
-        if final_video_gif_url:
-            completion_parts.append("Video GIF: Generated successfully")
-        else:
-            completion_parts.append(f"Video Script: '{final_video[:30]}...'")
-    
-    print(f"Workflow completed. {', '.join(completion_parts)}")
+    # Log completion summary; only assembled when debug logging is on
+    if logger.isEnabledFor(logging.DEBUG):
+        output_types = result.get("output_types", [])
+        completion_parts = []
+
+        if "text" in output_types:
+            completion_parts.append(f"Text: '{final_text[:50]}...'")
+
+        if "poster" in output_types:
+            if final_poster_url:
+                completion_parts.append("Poster: Generated successfully")
+            else:
+                completion_parts.append("Poster: Failed")
+
+        if "video" in output_types:
+            if final_video_gif_url:
+                completion_parts.append("Video GIF: Generated successfully")
+            else:
+                completion_parts.append(f"Video Script: '{final_video[:30]}...'")
+
+        logger.debug("Workflow completed. %s", ", ".join(completion_parts))
 
     return {
         "text": final_text,
@@ -3,18 +3,39 @@ Knowledge Base Manager for AgenticAds RAG system
 Handles document structure, ingestion pipeline, and knowledge organization
 """
 
-import json
 import asyncio
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass, asdict
+import orjson
+from typing import List, Dict, Any, Optional, Sequence
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 import os
+import threading
+import logging
 
 from .config import RAGConfig
 from .vector_store import VectorStoreManager, get_vector_store
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+# Records per MongoDB cursor batch, and per add_documents call during ingestion
+MONGO_INGEST_BATCH_SIZE = 500
+
+# Subdirectories created up front; each matches a KnowledgeDocument.content_type written by _save_document_to_file
+KNOWLEDGE_CONTENT_TYPES = ("template", "guideline", "feedback", "example")
+
+# Below this many files, load_documents_from_files reads them without a thread pool
+PARALLEL_LOAD_MIN_FILES = 32
+
+# Document fields copied into the vector store metadata, where search_similar_content filters on them
+VECTOR_FILTER_FIELDS = ("content_type", "platform", "tone", "category")
+
+# Shared by every untagged document instead of a fresh empty list each
+_EMPTY_TAGS: tuple = ()
+
+@dataclass(slots=True)
 class KnowledgeDocument:
     """Standardized knowledge document structure"""
     id: str
@@ -27,45 +48,122 @@ class KnowledgeDocument:
     platform: Optional[str] = None
     tone: Optional[str] = None
     category: Optional[str] = None
-    tags: List[str] = None
+    tags: Sequence[str] = None
 
     def __post_init__(self):
         if self.tags is None:
-            self.tags = []
+            self.tags = _EMPTY_TAGS
         if self.created_at is None:
             self.created_at = datetime.utcnow()
         if self.updated_at is None:
             self.updated_at = datetime.utcnow()
 
+    def vector_metadata(self) -> Dict[str, Any]:
+        """Metadata for the vector store, including the filterable fields so queries can filter on them"""
+        metadata = dict(self.metadata)
+        for field_name in VECTOR_FILTER_FIELDS:
+            value = getattr(self, field_name)
+            # Chroma metadata values cannot be None
+            if value is not None:
+                metadata[field_name] = value
+        return metadata
+
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for storage"""
+        """Convert to dictionary for storage; metadata and tags are shared, not copied"""
         return {
-            **asdict(self),
+            "id": self.id,
+            "content": self.content,
+            "metadata": self.metadata,
+            "source": self.source,
             "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat()
+            "updated_at": self.updated_at.isoformat(),
+            "content_type": self.content_type,
+            "platform": self.platform,
+            "tone": self.tone,
+            "category": self.category,
+            "tags": self.tags
         }
 
+def _json_files(directory: str) -> List[str]:
+    """Paths of the .json files under a directory, using the file types cached by scandir"""
+    paths = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                paths.extend(_json_files(entry.path))
+            elif entry.name.endswith(".json"):
+                paths.append(entry.path)
+    return paths
+
+def _directory_stamps(directory: str) -> List[tuple]:
+    """(path, mtime) for a directory and every directory below it, the same tree _json_files walks"""
+    stamps = [(directory, os.stat(directory).st_mtime_ns)]
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                stamps.extend(_directory_stamps(entry.path))
+    return stamps
+
+def _load_document_file(file_path: str) -> Optional[KnowledgeDocument]:
+    """Read one saved document, or None if it cannot be parsed"""
+    try:
+        with open(file_path, "rb") as f:
+            doc_data = orjson.loads(f.read())
+
+        # Convert back to KnowledgeDocument
+        return KnowledgeDocument(
+            id=doc_data["id"],
+            content=doc_data["content"],
+            metadata=doc_data["metadata"],
+            source=doc_data["source"],
+            created_at=datetime.fromisoformat(doc_data["created_at"]),
+            updated_at=datetime.fromisoformat(doc_data["updated_at"]),
+            content_type=doc_data["content_type"],
+            platform=doc_data.get("platform"),
+            tone=doc_data.get("tone"),
+            category=doc_data.get("category"),
+            tags=doc_data.get("tags") or _EMPTY_TAGS
+        )
+
+    except Exception:
+        logger.exception("Error loading document %s", file_path)
+        return None
+
 class KnowledgeBaseManager:
     """Manages the knowledge base for RAG system"""
 
+    # Directories already created in this process, shared by every manager instance
+    _created_dirs: set = set()
+
     def __init__(self, config: Optional[RAGConfig] = None):
         self.config = config or RAGConfig()
         self.vector_store = get_vector_store(config)
         self.knowledge_path = Path("./knowledge_base")
+        # Documents from the last directory read; dropped on every save since rewrites keep directory mtimes
+        self._doc_cache: Optional[List[KnowledgeDocument]] = None
+        self._doc_cache_stamp: tuple = ()
+        self._doc_cache_lock = threading.Lock()
         self._ensure_knowledge_directory()
 
     def _ensure_knowledge_directory(self):
         """Create knowledge base directory if it doesn't exist"""
-        self.knowledge_path.mkdir(exist_ok=True)
-        (self.knowledge_path / "templates").mkdir(exist_ok=True)
-        (self.knowledge_path / "guidelines").mkdir(exist_ok=True)
-        (self.knowledge_path / "feedback").mkdir(exist_ok=True)
-        (self.knowledge_path / "examples").mkdir(exist_ok=True)
+        for content_type in KNOWLEDGE_CONTENT_TYPES:
+            self._ensure_content_type_dir(content_type)
+
+    def _ensure_content_type_dir(self, content_type: str) -> Path:
+        """Return a content type's directory, creating it the first time any manager asks for it"""
+        content_type_dir = self.knowledge_path / content_type
+        if str(content_type_dir) not in KnowledgeBaseManager._created_dirs:
+            os.makedirs(content_type_dir, exist_ok=True)
+            KnowledgeBaseManager._created_dirs.add(str(content_type_dir))
+        return content_type_dir
 
     def create_ad_template(self, content: str, platform: str, tone: str,
-                          category: str = "general", tags: List[str] = None) -> KnowledgeDocument:
+                          category: str = "general", tags: List[str] = None,
+                          now: Optional[datetime] = None) -> KnowledgeDocument:
         """Create an ad template document"""
-        doc_id = f"template_{platform}_{tone}_{len(content)}chars_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+        now = now or datetime.utcnow()
+        doc_id = f"template_{platform}_{tone}_{len(content)}chars_{now.strftime('%Y%m%d_%H%M%S')}"
 
         metadata = {
             "platform": platform,
@@ -76,7 +174,6 @@ class KnowledgeBaseManager:
             "template_type": "text"
         }
 
-        now = datetime.utcnow()
         return KnowledgeDocument(
             id=doc_id,
             content=content,
@@ -86,15 +183,17 @@ class KnowledgeBaseManager:
             platform=platform,
             tone=tone,
             category=category,
-            tags=tags or [],
+            tags=tags or _EMPTY_TAGS,
             created_at=now,
             updated_at=now
         )
 
     def create_brand_guideline(self, content: str, brand_name: str,
-                              guideline_type: str = "general", tags: List[str] = None) -> KnowledgeDocument:
+                              guideline_type: str = "general", tags: List[str] = None,
+                              now: Optional[datetime] = None) -> KnowledgeDocument:
         """Create a brand guideline document"""
-        doc_id = f"guideline_{brand_name}_{guideline_type}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+        now = now or datetime.utcnow()
+        doc_id = f"guideline_{brand_name}_{guideline_type}_{now.strftime('%Y%m%d_%H%M%S')}"
 
         metadata = {
             "brand_name": brand_name,
@@ -103,7 +202,6 @@ class KnowledgeBaseManager:
             "word_count": len(content.split())
         }
 
-        now = datetime.utcnow()
         return KnowledgeDocument(
             id=doc_id,
             content=content,
@@ -118,24 +216,26 @@ class KnowledgeBaseManager:
 
     def create_successful_example(self, content: str, platform: str, tone: str,
                                  performance_metrics: Dict[str, Any] = None,
-                                 tags: List[str] = None) -> KnowledgeDocument:
+                                 tags: List[str] = None,
+                                 now: Optional[datetime] = None) -> KnowledgeDocument:
         """Create a successful ad example document"""
-        doc_id = f"example_{platform}_{tone}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+        now = now or datetime.utcnow()
+        doc_id = f"example_{platform}_{tone}_{now.strftime('%Y%m%d_%H%M%S')}"
 
-        # Flatten performance metrics into top-level metadata
-        metrics = performance_metrics or {}
         metadata = {
             "platform": platform,
             "tone": tone,
             "char_length": len(content),
             "word_count": len(content.split()),
-            "engagement_rate": metrics.get("engagement_rate", 0),
-            "click_through_rate": metrics.get("click_through_rate", 0),
-            "conversions": metrics.get("conversions", 0),
-            "performance_score": sum(metrics.values()) if metrics else 0
+            "performance_score": 0
         }
+        # Flatten performance metrics into top-level metadata; examples without metrics skip the placeholders
+        if performance_metrics:
+            metadata["engagement_rate"] = performance_metrics.get("engagement_rate", 0)
+            metadata["click_through_rate"] = performance_metrics.get("click_through_rate", 0)
+            metadata["conversions"] = performance_metrics.get("conversions", 0)
+            metadata["performance_score"] = sum(performance_metrics.values())
 
-        now = datetime.utcnow()
         return KnowledgeDocument(
             id=doc_id,
             content=content,
@@ -151,9 +251,11 @@ class KnowledgeBaseManager:
         )
 
     def create_user_feedback(self, content: str, platform: str, rating: int,
-                           user_id: str = "anonymous", tags: List[str] = None) -> KnowledgeDocument:
+                           user_id: str = "anonymous", tags: List[str] = None,
+                           now: Optional[datetime] = None) -> KnowledgeDocument:
         """Create a user feedback document"""
-        doc_id = f"feedback_{user_id}_{platform}_{rating}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+        now = now or datetime.utcnow()
+        doc_id = f"feedback_{user_id}_{platform}_{rating}_{now.strftime('%Y%m%d_%H%M%S')}"
 
         metadata = {
             "platform": platform,
@@ -164,7 +266,6 @@ class KnowledgeBaseManager:
             "feedback_type": "rating" if rating > 0 else "complaint"
         }
 
-        now = datetime.utcnow()
         return KnowledgeDocument(
             id=doc_id,
             content=content,
@@ -185,117 +286,115 @@ class KnowledgeBaseManager:
             self._save_document_to_file(document)
 
             # Add to vector store
-            doc_dict = document.to_dict()
             vector_docs = [{
                 "content": document.content,
-                "metadata": doc_dict["metadata"],
+                "metadata": document.vector_metadata(),
                 "id": document.id
             }]
 
             return self.vector_store.add_documents(vector_docs)
 
-        except Exception as e:
-            print(f"Error adding document {document.id}: {e}")
+        except Exception:
+            logger.exception("Error adding document %s", document.id)
             return False
 
-    def add_documents(self, documents: List[KnowledgeDocument]) -> bool:
-        """Add multiple documents to the knowledge base"""
+    def add_documents(self, documents: List[KnowledgeDocument], batch_size: int = 256) -> bool:
+        """Add multiple documents to the knowledge base in batches of at most batch_size"""
         try:
-            # Save to file system
-            for doc in documents:
-                self._save_document_to_file(doc)
+            success = True
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                for start in range(0, len(documents), batch_size):
+                    batch = documents[start:start + batch_size]
 
-            # Add to vector store
-            vector_docs = []
-            for doc in documents:
-                vector_docs.append({
-                    "content": doc.content,
-                    "metadata": doc.to_dict()["metadata"],
-                    "id": doc.id
-                })
+                    # Save to file system in the background while the batch is embedded
+                    saves = executor.map(self._save_document_to_file, batch)
 
-            return self.vector_store.add_documents(vector_docs)
+                    # Add to vector store
+                    vector_docs = [
+                        {"content": doc.content, "metadata": doc.vector_metadata(), "id": doc.id}
+                        for doc in batch
+                    ]
+
+                    success = self.vector_store.add_documents(vector_docs) and success
+
+                    # Wait for the backups, re-raising any write error
+                    for _ in saves:
+                        pass
 
-        except Exception as e:
-            print(f"Error adding documents: {e}")
+            return success
+
+        except Exception:
+            logger.exception("Error adding documents")
             return False
 
     def _save_document_to_file(self, document: KnowledgeDocument):
         """Save document to file system for backup"""
-        content_type_dir = self.knowledge_path / document.content_type
-        content_type_dir.mkdir(exist_ok=True)
+        file_path = self._ensure_content_type_dir(document.content_type) / f"{document.id}.json"
+        # orjson serializes the dataclass and its datetimes natively, matching to_dict() without building it
+        file_path.write_bytes(orjson.dumps(document))
+        # Under the lock so a load in progress cannot store its older list after this
+        with self._doc_cache_lock:
+            self._doc_cache = None
 
-        file_path = content_type_dir / f"{document.id}.json"
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(document.to_dict(), f, indent=2, ensure_ascii=False)
+    def _knowledge_dir_stamp(self) -> tuple:
+        """Modification times of every knowledge directory, which change when files are added or removed"""
+        return tuple(sorted(_directory_stamps(str(self.knowledge_path))))
 
     def load_documents_from_files(self) -> List[KnowledgeDocument]:
-        """Load documents from file system"""
-        documents = []
-
-        for content_type in ["templates", "guidelines", "feedback", "examples"]:
-            content_type_dir = self.knowledge_path / content_type
-            if not content_type_dir.exists():
-                continue
-
-            for file_path in content_type_dir.iterdir():
-                if file_path.suffix == ".json":
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            doc_data = json.load(f)
-
-                        # Convert back to KnowledgeDocument
-                        doc = KnowledgeDocument(
-                            id=doc_data["id"],
-                            content=doc_data["content"],
-                            metadata=doc_data["metadata"],
-                            source=doc_data["source"],
-                            created_at=datetime.fromisoformat(doc_data["created_at"]),
-                            updated_at=datetime.fromisoformat(doc_data["updated_at"]),
-                            content_type=doc_data["content_type"],
-                            platform=doc_data.get("platform"),
-                            tone=doc_data.get("tone"),
-                            category=doc_data.get("category"),
-                            tags=doc_data.get("tags", [])
-                        )
-                        documents.append(doc)
-
-                    except Exception as e:
-                        print(f"Error loading document {file_path}: {e}")
-
-        return documents
+        """Load documents from file system, reusing the last load while the directories are unchanged"""
+        with self._doc_cache_lock:
+            stamp = self._knowledge_dir_stamp()
+            if self._doc_cache is None or stamp != self._doc_cache_stamp:
+                self._doc_cache = self._read_document_files()
+                self._doc_cache_stamp = stamp
+            return list(self._doc_cache)
+
+    def _read_document_files(self) -> List[KnowledgeDocument]:
+        """Read and parse every saved document file"""
+        file_paths = sorted(_json_files(str(self.knowledge_path)))
+
+        # Small knowledge bases are cheaper to read inline than to hand to a thread pool
+        if len(file_paths) < PARALLEL_LOAD_MIN_FILES:
+            loaded = map(_load_document_file, file_paths)
+            return [doc for doc in loaded if doc is not None]
+
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+            loaded = executor.map(_load_document_file, file_paths)
+            return [doc for doc in loaded if doc is not None]
 
     def seed_initial_knowledge_base(self):
         """Seed the knowledge base with initial templates and guidelines"""
+        # One timestamp for the whole seed batch
+        now = datetime.utcnow()
 
         # Ad templates for different platforms and tones
         templates = [
             # Instagram templates
             self.create_ad_template(
                 "🌟 Transform your daily routine with our revolutionary fitness app! Join 10K+ users achieving their goals. #FitnessRevolution #GetFitToday",
-                "instagram", "motivational", "fitness", ["fitness", "motivation", "health"]
+                "instagram", "motivational", "fitness", ["fitness", "motivation", "health"], now=now
             ),
             self.create_ad_template(
                 "✨ Elevate your style game with our premium collection. Limited time offer: 30% off everything! Shop now and shine bright. #FashionForward",
-                "instagram", "luxury", "fashion", ["fashion", "luxury", "sale"]
+                "instagram", "luxury", "fashion", ["fashion", "luxury", "sale"], now=now
             ),
 
             # Facebook templates
             self.create_ad_template(
                 "Discover how our comprehensive business solution helped Sarah increase her revenue by 150% in just 6 months. Read her success story and see how we can help your business grow.",
-                "facebook", "professional", "business", ["business", "success", "growth"]
+                "facebook", "professional", "business", ["business", "success", "growth"], now=now
             ),
 
             # Twitter templates
             self.create_ad_template(
                 "🚨 Flash Sale Alert! 50% off all premium plans for the next 24 hours only! Don't miss out ⏰ #LimitedTime #Sale",
-                "twitter", "urgent", "general", ["sale", "urgent", "limited"]
+                "twitter", "urgent", "general", ["sale", "urgent", "limited"], now=now
             ),
 
             # LinkedIn templates
             self.create_ad_template(
                 "Industry Insight: The future of digital marketing in 2024. Our latest whitepaper reveals key trends and actionable strategies for forward-thinking professionals.",
-                "linkedin", "professional", "industry", ["marketing", "insights", "professional"]
+                "linkedin", "professional", "industry", ["marketing", "insights", "professional"], now=now
             )
         ]
 
@@ -303,15 +402,15 @@ class KnowledgeBaseManager:
         guidelines = [
             self.create_brand_guideline(
                 "Brand Voice: Professional, knowledgeable, and approachable. Use clear, concise language that demonstrates expertise while remaining accessible to all audiences.",
-                "AgenticAds", "voice", ["professional", "approachable", "expertise"]
+                "AgenticAds", "voice", ["professional", "approachable", "expertise"], now=now
             ),
             self.create_brand_guideline(
                 "Visual Style: Clean, modern design with blue and white color scheme. Use high-quality imagery and maintain consistent typography across all platforms.",
-                "AgenticAds", "visual", ["design", "modern", "consistent"]
+                "AgenticAds", "visual", ["design", "modern", "consistent"], now=now
             ),
             self.create_brand_guideline(
                 "Content Guidelines: Focus on value-driven content that educates and empowers users. Avoid aggressive sales language; emphasize solutions and benefits.",
-                "AgenticAds", "content", ["value", "education", "benefits"]
+                "AgenticAds", "content", ["value", "education", "benefits"], now=now
             )
         ]
 
@@ -321,25 +420,25 @@ class KnowledgeBaseManager:
                 "Instagram ads perform best with visually striking images, short compelling copy (under 100 characters), and 5-10 relevant hashtags. Focus on lifestyle and aspirational content.",
                 "instagram", "general",
                 {"engagement_rate": 0.85, "click_through_rate": 0.03, "conversions": 150},
-                ["best_practices", "instagram", "visual"]
+                ["best_practices", "instagram", "visual"], now=now
             ),
             self.create_successful_example(
                 "Facebook ads work well with detailed product descriptions, customer testimonials, and clear call-to-action buttons. Use longer copy that tells a complete story.",
                 "facebook", "general",
                 {"engagement_rate": 0.65, "click_through_rate": 0.02, "conversions": 200},
-                ["best_practices", "facebook", "storytelling"]
+                ["best_practices", "facebook", "storytelling"], now=now
             ),
             self.create_successful_example(
                 "Twitter ads should be concise, use trending hashtags, and encourage engagement through questions or polls. Keep copy under 100 characters when possible.",
                 "twitter", "general",
                 {"engagement_rate": 0.45, "click_through_rate": 0.015, "conversions": 75},
-                ["best_practices", "twitter", "concise"]
+                ["best_practices", "twitter", "concise"], now=now
             ),
             self.create_successful_example(
                 "LinkedIn ads perform best with professional tone, industry insights, and thought leadership content. Focus on business value and expertise demonstration.",
                 "linkedin", "general",
                 {"engagement_rate": 0.75, "click_through_rate": 0.025, "conversions": 120},
-                ["best_practices", "linkedin", "professional"]
+                ["best_practices", "linkedin", "professional"], now=now
             )
         ]
 
@@ -348,19 +447,19 @@ class KnowledgeBaseManager:
 
         success = self.add_documents(all_documents)
         if success:
-            print(f"Successfully seeded knowledge base with {len(all_documents)} documents")
+            logger.info("Successfully seeded knowledge base with %d documents", len(all_documents))
             
             # Verify vector store has documents
             try:
                 if hasattr(self.vector_store, 'collection'):
                     vector_count = self.vector_store.collection.count()
-                    print(f"✅ Vector store now contains {vector_count} documents")
+                    logger.info("Vector store now contains %d documents", vector_count)
                 else:
-                    print("⚠️  Vector store doesn't have collection attribute")
+                    logger.warning("Vector store doesn't have collection attribute")
             except Exception as e:
-                print(f"⚠️  Could not verify vector store count: {e}")
+                logger.warning("Could not verify vector store count: %s", e)
         else:
-            print("Failed to seed knowledge base")
+            logger.error("Failed to seed knowledge base")
 
         return success
 
@@ -371,48 +470,51 @@ class KnowledgeBaseManager:
         """Retrieve documents based on filters"""
         documents = self.load_documents_from_files()
 
-        filtered_docs = documents
-
-        if content_type:
-            filtered_docs = [doc for doc in filtered_docs if doc.content_type == content_type]
-
-        if platform:
-            filtered_docs = [doc for doc in filtered_docs if doc.platform == platform]
-
-        if tone:
-            filtered_docs = [doc for doc in filtered_docs if doc.tone == tone]
-
-        if category:
-            filtered_docs = [doc for doc in filtered_docs if doc.category == category]
-
-        return filtered_docs
+        # One pass with every filter applied together; an empty filter matches everything
+        return [
+            doc for doc in documents
+            if (not content_type or doc.content_type == content_type)
+            and (not platform or doc.platform == platform)
+            and (not tone or doc.tone == tone)
+            and (not category or doc.category == category)
+        ]
 
     def search_similar_content(self, query: str, n_results: int = 5,
-                             platform: Optional[str] = None) -> List[KnowledgeDocument]:
-        """Search for similar content using vector similarity"""
+                             platform: Optional[str] = None,
+                             content_type: Optional[str] = None,
+                             tone: Optional[str] = None,
+                             category: Optional[str] = None) -> List[KnowledgeDocument]:
+        """Search for similar content using vector similarity, filtering inside the vector store"""
         try:
+            filters = [
+                {key: value}
+                for key, value in (("platform", platform), ("content_type", content_type),
+                                   ("tone", tone), ("category", category))
+                if value
+            ]
+            where = None
+            if len(filters) == 1:
+                where = filters[0]
+            elif filters:
+                where = {"$and": filters}
+
             # Query vector store
             results = self.vector_store.query(
                 query_texts=[query],
                 n_results=n_results,
-                where={"platform": platform} if platform else None
+                where=where
             )
 
             if not results["documents"] or not results["documents"][0]:
                 return []
 
-            # Load full documents based on IDs
-            similar_docs = []
-            for doc_id in results["metadatas"][0]:
-                docs = self.get_documents_by_filter()
-                doc = next((d for d in docs if d.id == doc_id), None)
-                if doc:
-                    similar_docs.append(doc)
+            # Load full documents based on IDs, reading the files once for all results
+            documents_by_id = {doc.id: doc for doc in self.load_documents_from_files()}
+            result_ids = (results.get("ids") or [[]])[0]
+            return [documents_by_id[doc_id] for doc_id in result_ids if doc_id in documents_by_id]
 
-            return similar_docs
-
-        except Exception as e:
-            print(f"Error searching similar content: {e}")
+        except Exception:
+            logger.exception("Error searching similar content")
             return []
 
     def get_knowledge_stats(self) -> Dict[str, Any]:
@@ -430,35 +532,27 @@ class KnowledgeBaseManager:
         except Exception:
             vector_count = 0
 
-        stats = {
-            "total_documents": max(len(documents), vector_count),
-            "by_content_type": {},
-            "by_platform": {},
-            "by_tone": {},
-            "by_category": {}
-        }
+        by_content_type: Counter = Counter()
+        by_platform: Counter = Counter()
+        by_tone: Counter = Counter()
+        by_category: Counter = Counter()
 
         for doc in documents:
-            # Count by content type
-            content_type = doc.content_type
-            stats["by_content_type"][content_type] = stats["by_content_type"].get(content_type, 0) + 1
-
-            # Count by platform
+            by_content_type[doc.content_type] += 1
             if doc.platform:
-                platform = doc.platform
-                stats["by_platform"][platform] = stats["by_platform"].get(platform, 0) + 1
-
-            # Count by tone
+                by_platform[doc.platform] += 1
             if doc.tone:
-                tone = doc.tone
-                stats["by_tone"][tone] = stats["by_tone"].get(tone, 0) + 1
-
-            # Count by category
+                by_tone[doc.tone] += 1
             if doc.category:
-                category = doc.category
-                stats["by_category"][category] = stats["by_category"].get(category, 0) + 1
+                by_category[doc.category] += 1
 
-        return stats
+        return {
+            "total_documents": max(len(documents), vector_count),
+            "by_content_type": dict(by_content_type),
+            "by_platform": dict(by_platform),
+            "by_tone": dict(by_tone),
+            "by_category": dict(by_category)
+        }
 
     async def ingest_from_mongodb(self, mongodb_url: str = "mongodb://localhost:27017",
                                   db_name: str = "agentic_ads"):
@@ -469,65 +563,80 @@ class KnowledgeBaseManager:
             client = AsyncIOMotorClient(mongodb_url)
             db = client[db_name]
 
-            # Ingest generation history
-            generation_collection = db.generation_history
-            generations = await generation_collection.find().to_list(length=None)
-
-            generation_docs = []
-            for gen in generations:
-                if gen.get("status") == "Completed":  # Only successful generations
-                    doc = self.create_successful_example(
-                        content=gen.get("adText", ""),
-                        platform=gen.get("platform", "unknown"),
-                        tone=gen.get("tone", "general").lower(),
-                        performance_metrics={
-                            "engagement_rate": 0.7,  # Placeholder - would need real metrics
-                            "click_through_rate": 0.02,
-                            "conversions": 1
-                        },
-                        tags=["historical", "generation_history"]
-                    )
-                    generation_docs.append(doc)
-
-            # Ingest user feedback
-            feedback_collection = db.feedback
-            feedbacks = await feedback_collection.find().to_list(length=None)
-
-            feedback_docs = []
-            for feedback in feedbacks:
-                doc = self.create_user_feedback(
-                    content=feedback.get("message", ""),
-                    platform=feedback.get("platform", "unknown"),
-                    rating=feedback.get("rating", 3),
-                    user_id=f"user_{feedback.get('email', 'anonymous')}",
-                    tags=["historical", "user_feedback"]
-                )
-                feedback_docs.append(doc)
-
-            # Add all documents
-            all_docs = generation_docs + feedback_docs
-            if all_docs:
-                success = self.add_documents(all_docs)
-                if success:
-                    print(f"Successfully ingested {len(all_docs)} documents from MongoDB")
-                    return len(all_docs)
-                else:
-                    print("Failed to ingest documents from MongoDB")
-                    return 0
+            # Stream both collections concurrently; only successful generations are ingested
+            generation_cursor = db.generation_history.find({"status": "Completed"}).batch_size(MONGO_INGEST_BATCH_SIZE)
+            feedback_cursor = db.feedback.find().batch_size(MONGO_INGEST_BATCH_SIZE)
+            generation_count, feedback_count = await asyncio.gather(
+                self._ingest_cursor(generation_cursor, self._generation_to_document),
+                self._ingest_cursor(feedback_cursor, self._feedback_to_document)
+            )
+
+            total = generation_count + feedback_count
+            if total:
+                logger.info("Successfully ingested %d documents from MongoDB", total)
             else:
-                print("No documents to ingest from MongoDB")
-                return 0
+                logger.info("No documents ingested from MongoDB")
+            return total
 
-        except Exception as e:
-            print(f"Error ingesting from MongoDB: {e}")
+        except Exception:
+            logger.exception("Error ingesting from MongoDB")
             return 0
 
+    async def _ingest_cursor(self, cursor, to_document) -> int:
+        """Add a MongoDB cursor's records in batches as they arrive; returns how many were added"""
+        added = 0
+        batch: List[KnowledgeDocument] = []
+        async for record in cursor:
+            batch.append(to_document(record))
+            if len(batch) >= MONGO_INGEST_BATCH_SIZE:
+                added += await self._add_ingested_batch(batch)
+                batch = []
+
+        if batch:
+            added += await self._add_ingested_batch(batch)
+        return added
+
+    async def _add_ingested_batch(self, batch: List[KnowledgeDocument]) -> int:
+        """Add one ingestion batch off the event loop; returns how many documents were added"""
+        if await asyncio.to_thread(self.add_documents, batch):
+            return len(batch)
+        logger.error("Failed to ingest a batch of %d documents from MongoDB", len(batch))
+        return 0
+
+    def _generation_to_document(self, gen: Dict[str, Any]) -> KnowledgeDocument:
+        """Convert a completed generation history record into an example document"""
+        return self.create_successful_example(
+            content=gen.get("adText", ""),
+            platform=gen.get("platform", "unknown"),
+            tone=gen.get("tone", "general").lower(),
+            performance_metrics={
+                "engagement_rate": 0.7,  # Placeholder - would need real metrics
+                "click_through_rate": 0.02,
+                "conversions": 1
+            },
+            tags=["historical", "generation_history"]
+        )
+
+    def _feedback_to_document(self, feedback: Dict[str, Any]) -> KnowledgeDocument:
+        """Convert a feedback record into a user feedback document"""
+        return self.create_user_feedback(
+            content=feedback.get("message", ""),
+            platform=feedback.get("platform", "unknown"),
+            rating=feedback.get("rating", 3),
+            user_id=f"user_{feedback.get('email', 'anonymous')}",
+            tags=["historical", "user_feedback"]
+        )
+
 # Global knowledge base manager instance
 knowledge_manager = None
+_knowledge_manager_lock = threading.Lock()
 
 def get_knowledge_manager(config: Optional[RAGConfig] = None) -> KnowledgeBaseManager:
     """Get or create global knowledge base manager instance"""
     global knowledge_manager
     if knowledge_manager is None:
-        knowledge_manager = KnowledgeBaseManager(config)
+        # Checked again under the lock so concurrent first calls build only one manager
+        with _knowledge_manager_lock:
+            if knowledge_manager is None:
+                knowledge_manager = KnowledgeBaseManager(config)
     return knowledge_manager
@@ -283,7 +283,8 @@ class PosterGenerationAgent:
 
         # Save image to file
         try:
-            image.save(file_path, format='PNG')
+            # PNG encoding and the disk write run off the event loop
+            await asyncio.to_thread(image.save, file_path, format='PNG')
             print(f"🎨 [PosterAgent] _save_poster_to_file: Image saved successfully")
             print(f"🎨 [PosterAgent] _save_poster_to_file: File exists after save: {file_path.exists()}")
             print(f"🎨 [PosterAgent] _save_poster_to_file: File size: {file_path.stat().st_size} bytes")
@@ -10,11 +10,18 @@ from datetime import datetime
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 import chromadb
+import torch
 from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
 
 from .config import RAGConfig
 
+def _embedding_dtype() -> Optional[torch.dtype]:
+    """Half-precision weights on GPU (bf16 where supported); None keeps fp32 on CPU"""
+    if not torch.cuda.is_available():
+        return None
+    return torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+
 class VectorStoreManager:
     """Manages vector database operations for RAG system"""
     _instance = None
@@ -29,6 +36,8 @@ class VectorStoreManager:
             cls._instance.embedding_model = None
             cls._instance._collection_id = None
             cls._instance._is_temp_db = False
+            # Bumped whenever the collection's contents may have changed; callers caching query results key on it
+            cls._instance.knowledge_version = 0
         return cls._instance
 
     def __init__(self, config: Optional[RAGConfig] = None):
@@ -111,7 +120,11 @@ class VectorStoreManager:
 
             # Initialize embedding model
             print("🔧 Loading embedding model...")
-            self.embedding_model = SentenceTransformer(self.config.embedding_model)
+            dtype = _embedding_dtype()
+            self.embedding_model = SentenceTransformer(
+                self.config.embedding_model,
+                model_kwargs={"torch_dtype": dtype} if dtype else None
+            )
 
             # Create or get collection
             print(f"🔧 Setting up collection: {self.config.collection_name}")
@@ -172,32 +185,36 @@ class VectorStoreManager:
             return True
 
         try:
-            # Process documents in smaller batches
+            contents = [str(doc["content"]) for doc in documents]
+            metadatas = [self._flatten_metadata(doc.get("metadata", {})) for doc in documents]
+            ids = [str(doc.get("id", f"doc_{j}")) for j, doc in enumerate(documents)]
+
+            # Encode everything in one call; unit-length so cosine similarity is a plain dot product
+            embeddings = self.embedding_model.encode(
+                contents,
+                batch_size=128,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            )
+
+            # Write to Chroma in smaller batches so a failure only retries part of the data
             batch_size = 50
             success = True
 
             for i in range(0, len(documents), batch_size):
-                batch = documents[i:i + batch_size]
-                
-                # Extract content and metadata for batch
-                contents = [str(doc["content"]) for doc in batch]
-                metadatas = [self._flatten_metadata(doc.get("metadata", {})) for doc in batch]
-                ids = [str(doc.get("id", f"doc_{j}")) for j, doc in enumerate(batch, start=i)]
-
-                # Generate embeddings
-                embeddings = self.embedding_model.encode(contents).tolist()
+                batch = slice(i, i + batch_size)
 
                 # Add documents with retry logic
                 max_retries = 3
                 for attempt in range(max_retries):
                     try:
                         self.collection.add(
-                            documents=contents,
-                            embeddings=embeddings,
-                            metadatas=metadatas,
-                            ids=ids
+                            documents=contents[batch],
+                            embeddings=embeddings[batch],
+                            metadatas=metadatas[batch],
+                            ids=ids[batch]
                         )
-                        print(f"✅ Added batch {i//batch_size + 1} ({len(batch)} documents)")
+                        print(f"✅ Added batch {i//batch_size + 1} ({len(ids[batch])} documents)")
                         break
                     except Exception as e:
                         if "Collection does not exist" in str(e):
@@ -210,22 +227,10 @@ class VectorStoreManager:
                             break
                         print(f"Retrying batch {i//batch_size + 1}... ({attempt + 1}/{max_retries})")
 
+            # Some batches may have been written even when others failed
+            self.knowledge_version += 1
             return success
 
-            # Generate embeddings
-            embeddings = self.embedding_model.encode(contents).tolist()
-
-            # Add to collection
-            self.collection.add(
-                documents=contents,
-                metadatas=metadatas,
-                ids=ids,
-                embeddings=embeddings
-            )
-
-            print(f"Added {len(documents)} documents to vector store")
-            return True
-
         except Exception as e:
             print(f"Error adding documents: {e}")
             return False
@@ -241,7 +246,7 @@ class VectorStoreManager:
         """
         try:
             # Generate query embeddings
-            query_embeddings = self.embedding_model.encode(query_texts).tolist()
+            query_embeddings = self.embedding_model.encode(query_texts, normalize_embeddings=True)
 
             # Query the collection
             results = self.collection.query(
@@ -356,6 +361,7 @@ class VectorStoreManager:
                 name=self.config.collection_name,
                 metadata={"description": "AgenticAds knowledge base for ad generation"}
             )
+            self.knowledge_version += 1
             print("Cleared vector store collection")
             return True
         except Exception as e:
@@ -153,14 +153,15 @@ class VideoGIFGenerationAgent:
 
     async def _generate_single_frame(self, prompt: str, index: int, width: int, height: int) -> Image.Image:
         print(f"🎬 [VideoGIF] Generating frame {index + 1}")
+        # Frame drawing and logo compositing are CPU-bound, so they run in worker threads
         if self.huggingface_api_key:
             image = await self._generate_with_huggingface(prompt, width, height)
             if image is not None:
-                return self._apply_logo(image)
+                return await asyncio.to_thread(self._apply_logo, image)
 
         print(f"⚠️ [VideoGIF] Using fallback frame for index {index}")
-        fallback = self._create_fallback_frame(prompt, index, width=width, height=height)
-        return self._apply_logo(fallback)
+        fallback = await asyncio.to_thread(self._create_fallback_frame, prompt, index, width, height)
+        return await asyncio.to_thread(self._apply_logo, fallback)
 
     async def _generate_with_huggingface(self, prompt: str, width: int, height: int) -> Optional[Image.Image]:
         api_url = "https://api-inference.huggingface.co/models/stabilityai/stable-diffusion-xl-base-1.0"
@@ -293,7 +294,9 @@ class VideoGIFGenerationAgent:
         file_path = self.temp_dir / filename
 
         first_frame, *additional_frames = frames
-        first_frame.save(
+        # GIF quantization and encoding are the slowest step; keep them off the event loop
+        await asyncio.to_thread(
+            first_frame.save,
             file_path,
             format="GIF",
             save_all=True,
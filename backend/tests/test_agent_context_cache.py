@@ -0,0 +1,66 @@
+"""Retrieved agent context must not outlive a change to the knowledge base"""
+
+from rag.agents import AgentContext, BaseAgent
+from rag.vector_store import VectorStoreManager
+
+
+class FakeCollection:
+    """In-memory stand-in for a Chroma collection that returns every stored document"""
+
+    def __init__(self):
+        self.documents = []
+
+    def add(self, documents, embeddings, metadatas, ids):
+        self.documents.extend(documents)
+
+    def query(self, query_embeddings, n_results, include):
+        # Only embeddings are accepted, so a query_texts call (Chroma's default embedder) fails the test
+        return {"documents": [self.documents[:n_results] for _ in query_embeddings]}
+
+
+class FakeEmbeddingModel:
+    def encode(self, texts, **kwargs):
+        return [[0.0, 0.0, 0.0] for _ in texts]
+
+
+def make_store():
+    # Bypass the singleton's __init__ so no Chroma client or model is loaded
+    store = object.__new__(VectorStoreManager)
+    store.collection = FakeCollection()
+    store.embedding_model = FakeEmbeddingModel()
+    store.knowledge_version = 0
+    return store
+
+
+def make_agent(store):
+    context = AgentContext(
+        platform="instagram",
+        tone="fun",
+        brand_guidelines=None,
+        input_text="summer sale",
+        vector_store=store,
+        embedding_model=store.embedding_model,
+    )
+    return BaseAgent("test", context)
+
+
+def test_retrieve_context_is_fresh_after_knowledge_base_change():
+    store = make_store()
+    agent = make_agent(store)
+
+    store.add_documents([{"id": "seed", "content": "seeded tip", "metadata": {}}])
+    assert agent._retrieve_context("summer sale") == ["seeded tip"]
+
+    store.add_documents([{"id": "new", "content": "ingested tip", "metadata": {}}])
+    assert agent._retrieve_context("summer sale") == ["seeded tip", "ingested tip"]
+
+
+def test_retrieve_context_batch_is_fresh_after_knowledge_base_change():
+    store = make_store()
+    agent = make_agent(store)
+
+    store.add_documents([{"id": "seed", "content": "seeded tip", "metadata": {}}])
+    assert agent._retrieve_context_batch(["winter sale"]) == [["seeded tip"]]
+
+    store.add_documents([{"id": "new", "content": "ingested tip", "metadata": {}}])
+    assert agent._retrieve_context_batch(["winter sale"]) == [["seeded tip", "ingested tip"]]